@@ -1,9 +1,12 @@
 import streamlit as st
-from modules.report import build_deck
-from modules.storage import load_log, DATA_DIR
-from modules.metrics import compute
+import pandas as pd
+from modules.cache import memo
+from modules.storage import load_log, date_span, data_file, data_version, backend_for
+from modules.metrics import compute, row_at, LOOKBACK
 from modules.units import UNIT_DEFS
+from modules import demo, perf, sidecar
 from modules.ui import sidebar, kpi, charts, heatmap
+from modules.ui._compat import fragment
 
 st.set_page_config(page_title="Demby Analytics™", layout="wide")
 
@@ -185,46 +188,104 @@ st.markdown(
 if "nickname" not in st.session_state:
     st.info("Viewing demo data. Choose a nickname in the sidebar to start your own log!")
 else:
-    st.caption(f"Your data file: {DATA_DIR / (st.session_state.nickname + '.csv')}")
+    st.caption(f"Your data file: {data_file()}")
 
 
-df_raw = load_log()
-sidebar.draw(df_raw)           # sidebar first (may rerun)
+perf.begin(st.session_state.get("nickname"))
 
-df = compute(df_raw)
+with perf.span("sidebar.draw"):
+    sidebar.draw()             # sidebar first (may rerun)
+
+# ----------  history window  ----------
+# Only the displayed window (plus the metrics lookback) is read from disk,
+# so first paint stays flat as histories grow.
+WINDOWS = {"Last 90 days": 90, "Last year": 365, "All time": None}
+window = st.radio("History", list(WINDOWS), horizontal=True)
+
+_, last_date = date_span()
+start = None
+if WINDOWS[window] is not None and last_date is not None:
+    start = last_date - pd.Timedelta(days=WINDOWS[window] - 1)
+
+def _windowed_metrics():
+    if sidecar.ENABLED:        # persisted full-history metrics, refreshed if stale
+        with perf.span("sidecar"):
+            return sidecar.load(*backend_for(), start=start)
+    with perf.span("load_log"):
+        raw = load_log(start=start, lookback=LOOKBACK)
+    with perf.span("compute"):
+        out = compute(raw)
+    if start is not None:
+        out = out[out["date"] >= start].reset_index(drop=True)
+    return out
+
+# parsed log and metrics are both memoized on the file's (path, mtime, size);
+# anonymous visitors share one prebuilt demo bundle (metrics, charts, deck)
+demo_bundle = None
+if "nickname" not in st.session_state:
+    demo_bundle = demo.bundle(WINDOWS[window])
+    df = demo_bundle.metrics
+else:
+    df = memo(data_version(), ("compute", start), _windowed_metrics)
 
 if df.empty:
     st.warning("No data yet. Use the sidebar to log your first entry.")
     st.stop()
 
-# Add date selector for KPIs
-st.markdown("### 📊 Key Performance Indicators")
-col1, col2 = st.columns([1, 3])
-with col1:
-    available_dates = df['date'].dt.date.tolist()
-    available_dates.reverse()  # Most recent first
-    selected_date = st.selectbox(
-        "View KPIs for date:",
-        options=available_dates,
-        index=0,  # Default to most recent (now first in list)
-        format_func=lambda x: x.strftime("%Y-%m-%d")
-    )
+# ----------  sections  ----------
+# KPI, charts and heat-map are fragments: a widget inside one (the KPI
+# date, the heat-map range) reruns just that section, not the whole page.
+@fragment
+def _kpi_section(df):
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        first_day, last_day = df["date"].iloc[0].date(), df["date"].iloc[-1].date()
+        selected_date = st.date_input(
+            "View KPIs for date:",
+            value=last_day,            # default to most recent
+            min_value=first_day,
+            max_value=last_day,
+        )
 
-# Get data for selected date
-selected_row = df[df['date'].dt.date == selected_date].iloc[0]
-kpi.draw(df, selected_row)
-st.caption(UNIT_DEFS)
+    # Entry for the selected date (or the last one before it), found by bisection
+    selected_row = row_at(df, selected_date)
+    with perf.span("kpi.draw"):
+        kpi.draw(selected_row)
 
-chart_path = charts.draw(df)   # main charts
-heatmap.draw(df)               # calendar view
+@fragment
+def _charts_section(df, specs=None):
+    with perf.span("charts.draw"):
+        charts.draw(df, specs)         # main charts
 
-# after all charts rendered
-pptx_file  = build_deck(df, {"juice_anx": chart_path})
+@fragment
+def _heatmap_section():
+    with perf.span("heatmap.draw"):
+        heatmap.draw()             # calendar view (own range picker)
 
-with open(pptx_file, "rb") as f:
+st.markdown("### 📊 Key Performance Indicators")
+_kpi_section(df)
+st.caption(UNIT_DEFS)
+
+_charts_section(df, demo_bundle and demo_bundle.charts)
+_heatmap_section()
+
+# board deck (and the chart PNG only it uses) is only built when asked
+# for, and memoized on its content; PNG → deck → download never touches
+# the filesystem
+if st.button("Prepare Board Deck"):
+    from modules.report import build_deck_cached, deck_filename   # python-pptx: load on demand
+    with perf.span("build_deck"):
+        deck = (demo_bundle.deck() if demo_bundle
+                else build_deck_cached(df, {"juice_anx": charts.deck_png(df)}))
     st.download_button(
         "Download Board Deck",
-        data=f,
-        file_name=pptx_file.name,
+        data=deck,
+        file_name=deck_filename(df),
         mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
     )
+
+# ----------  per-rerun timings  ----------
+run = perf.end(rows=len(df))
+if perf.PERF_PANEL and run is not None:
+    with st.expander("⏱ Performance (this rerun)"):
+        st.json(run)
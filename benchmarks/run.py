@@ -0,0 +1,258 @@
+# benchmarks/run.py
+# ---------------------------------------------------------------------
+# Timing suite for the dashboard's hot paths at growing history sizes.
+#
+#   python -m benchmarks.run                       # 10, 1k, 100k, 1M rows
+#   python -m benchmarks.run --sizes 10 1000       # quick pass
+#   python -m benchmarks.run --update-baseline     # record new baseline
+#
+# Results are compared against a JSON baseline (if present); any case
+# slower than baseline × (1 + threshold) is flagged and the run exits 1.
+# Cases that return a DataFrame also report its memory per row.
+# ---------------------------------------------------------------------
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from modules import metrics, report
+from modules.backends import _typed
+from modules.backends.csv_store import CsvBackend
+from modules.backends.parquet_store import ParquetBackend
+from modules.backends.sqlite_store import SqliteBackend
+from modules.ui import charts, heatmap
+
+SIZES     = [10, 1_000, 100_000, 1_000_000]
+BASELINE  = Path(__file__).with_name("baseline.json")
+THRESHOLD = 0.25          # flag cases >25 % slower than baseline
+
+# pandas timestamps span ~580 years, so longer histories are spaced hourly
+_MAX_DAILY = 200_000
+
+CASES = {}
+
+
+def case(name):
+    """Register `setup(n, tmp) -> callable` as a benchmark case."""
+    def wrap(setup):
+        CASES[name] = setup
+        return setup
+    return wrap
+
+
+def history(n: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic raw log of `n` entries, typed like load_log's output."""
+    rng = np.random.default_rng(seed)
+    if n <= _MAX_DAILY:
+        dates = pd.date_range("1700-01-01", periods=n, freq="D")
+    else:
+        dates = pd.date_range("1900-01-01", periods=n, freq="h")
+    return _typed(pd.DataFrame({
+        "date": dates,
+        "juice": rng.integers(0, 11, n),
+        "anxiety": rng.integers(0, 11, n),
+        "event": np.where(rng.random(n) < 0.02, "note", ""),
+    }))
+
+
+def _csv_backend(n: int, tmp: Path) -> CsvBackend:
+    backend = CsvBackend(tmp)
+    fmt = "%Y-%m-%d" if n <= _MAX_DAILY else None
+    history(n).to_csv(backend.location("bench"), index=False, date_format=fmt)
+    return backend
+
+
+def _parquet_backend(n: int, tmp: Path) -> ParquetBackend:
+    backend = ParquetBackend(tmp)
+    backend._write_base(backend.location("bench"), history(n))
+    return backend
+
+
+def _sqlite_backend(n: int, tmp: Path) -> SqliteBackend:
+    backend = SqliteBackend(tmp / "bench.sqlite3")
+    rows = history(n).assign(date=lambda d: d["date"].astype(str))
+    with backend._conn() as conn:
+        conn.executemany(
+            "INSERT INTO entries VALUES ('bench', ?, ?, ?, ?)",
+            rows.itertuples(index=False, name=None),
+        )
+    return backend
+
+
+# ── cases ─────────────────────────────────────────────────────────────────
+@case("load_log[csv]")
+def _(n, tmp):
+    backend = _csv_backend(n, tmp)
+    return lambda: backend.load("bench")
+
+
+@case("load_log[sqlite]")
+def _(n, tmp):
+    backend = _sqlite_backend(n, tmp)
+    return lambda: backend.load("bench")
+
+
+@case("load_log[parquet]")
+def _(n, tmp):
+    backend = _parquet_backend(n, tmp)
+    return lambda: backend.load("bench")
+
+
+@case("load_log[parquet,90d]")
+def _(n, tmp):
+    backend = _parquet_backend(n, tmp)
+    start = backend.span("bench")[1] - pd.Timedelta(days=89)
+    return lambda: backend.load("bench", start=start, lookback=metrics.LOOKBACK)
+
+
+@case("upsert_entry[csv]")
+def _(n, tmp):
+    backend = _csv_backend(n, tmp)
+    return lambda: backend.upsert("bench", "2262-01-01", 5, 4, "bench")
+
+
+@case("upsert_entry[sqlite]")
+def _(n, tmp):
+    backend = _sqlite_backend(n, tmp)
+    return lambda: backend.upsert("bench", "2262-01-01", 5, 4, "bench")
+
+
+@case("upsert_entry[parquet]")
+def _(n, tmp):
+    backend = _parquet_backend(n, tmp)
+    return lambda: backend.upsert("bench", "2262-01-01", 5, 4, "bench")
+
+
+@case("metrics.compute")
+def _(n, tmp):
+    df = history(n)
+    return lambda: metrics.compute(df)
+
+
+def cohort(n: int) -> pd.DataFrame:
+    """`n` entries spread over profiles of one year each (long format)."""
+    df = history(n)
+    return df.assign(profile=np.arange(n) // 365, date=df["date"].iloc[np.arange(n) % 365].to_numpy())
+
+
+@case("cohort[vectorised]")
+def _(n, tmp):
+    df = cohort(n)
+    return lambda: metrics.compute_many(df)
+
+
+@case("cohort[loop]")
+def _(n, tmp):
+    groups = [g for _, g in cohort(n).groupby("profile")]
+    return lambda: [metrics.compute(g) for g in groups]
+
+
+@case("charts.juice_anxiety_chart")
+def _(n, tmp):
+    df = metrics.compute(history(n))
+    return lambda: charts.juice_anxiety_chart(df, export=False)[0].to_dict()
+
+
+@case("charts.gq_chart")
+def _(n, tmp):
+    df = metrics.compute(history(n))
+    return lambda: charts.gq_chart(df).to_dict()
+
+
+@case("charts.dgqdt_chart")
+def _(n, tmp):
+    df = metrics.compute(history(n))
+    return lambda: charts.dgqdt_chart(df).to_dict()
+
+
+@case("heatmap.matrix")
+def _(n, tmp):
+    df = metrics.compute(history(n))
+    return lambda: heatmap.matrix(df)
+
+
+@case("report.build_deck")
+def _(n, tmp):
+    df = metrics.compute(history(n))
+    return lambda: report.build_deck(df, {"juice_anx": None})
+
+
+# ── runner ────────────────────────────────────────────────────────────────
+def run(sizes=SIZES, repeat: int = 3, only=None) -> tuple[dict, dict]:
+    """
+    Median seconds per call for every case × size, plus bytes per row of
+    any DataFrame a case returns: ({"case@n": seconds}, {"case@n": bytes}).
+    """
+    alt.data_transformers.disable_max_rows()   # measure full-size specs
+    times, memory = {}, {}
+    for n in sizes:
+        for name, setup in CASES.items():
+            if only and not any(o in name for o in only):
+                continue
+            key = f"{name}@{n}"
+            with tempfile.TemporaryDirectory() as tmp:
+                fn = setup(n, Path(tmp))
+                samples = []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    out = fn()
+                    samples.append(time.perf_counter() - t0)
+            times[key] = statistics.median(samples)
+            line = f"{key:<40} {times[key] * 1e3:>12.2f} ms"
+            if isinstance(out, pd.DataFrame) and len(out):
+                memory[key] = float(out.memory_usage(deep=True).sum() / len(out))
+                line += f" {memory[key]:>10.1f} B/row"
+            print(line, flush=True)
+    return times, memory
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD) -> list[str]:
+    """Keys whose time exceeds baseline × (1 + threshold)."""
+    return [k for k, t in results.items()
+            if k in baseline and t > baseline[k] * (1 + threshold)]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Time the dashboard's hot paths.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", nargs="+", help="run cases whose name contains any of these")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--threshold", type=float, default=THRESHOLD)
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args(argv)
+
+    results, memory = run(args.sizes, args.repeat, args.only)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({
+            "machine": platform.platform(),
+            "python": platform.python_version(),
+            "results": results,
+            "bytes_per_row": memory,
+        }, indent=2))
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("no baseline yet (run with --update-baseline)")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())["results"]
+    slow = compare(results, baseline, args.threshold)
+    for k in slow:
+        print(f"REGRESSION {k}: {results[k] * 1e3:.2f} ms "
+              f"vs baseline {baseline[k] * 1e3:.2f} ms")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
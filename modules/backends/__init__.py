@@ -0,0 +1,155 @@
+# modules/backends/__init__.py
+# ---------------------------------------------------------------------
+# Pluggable homes for profile logs.
+#
+# Every backend stores rows of ["date", "juice", "anxiety", "event"]
+# keyed by (profile, date) and hands them back as a DataFrame sorted
+# by date.  modules.storage picks one via the STORAGE_BACKEND env var.
+# ---------------------------------------------------------------------
+from pathlib import Path
+import importlib.util
+import os
+import threading
+import pandas as pd
+
+COLUMNS = ["date", "juice", "anxiety", "event"]
+REQUIRED = ["date", "juice", "anxiety"]         # "event" is optional on import
+
+# Compact in-memory schema for loaded logs: scores are 0–10 with at most
+# one decimal, so float32 is exact enough; events are mostly empty short
+# strings, which Arrow stores far more tightly than Python objects.
+_EVENT_DTYPE = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else "string"
+DTYPES = {"juice": "float32", "anxiety": "float32", "event": _EVENT_DTYPE}
+
+
+class Backend:
+    """Interface shared by all storage backends."""
+
+    def location(self, profile: str) -> Path:
+        """File that holds `profile`'s data (shown in the UI)."""
+        raise NotImplementedError
+
+    def profiles(self) -> list[str]:
+        """Every profile that has data stored, sorted."""
+        raise NotImplementedError
+
+    def load(self, profile: str, start=None, end=None, columns=None,
+             lookback: int = 0) -> pd.DataFrame:
+        """
+        Rows for `profile` with start <= date <= end, sorted by date, plus up
+        to `lookback` entries just before `start` (for rolling windows).
+        `columns` limits the value columns read; "date" is always included.
+        """
+        raise NotImplementedError
+
+    def version(self, profile: str):
+        """
+        Hashable token that changes whenever `profile`'s data changes
+        (typically path, mtime and size of the files involved).
+        """
+        raise NotImplementedError
+
+    def span(self, profile: str) -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
+        """(first, last) logged date without loading the whole log."""
+        raise NotImplementedError
+
+    def upsert(self, profile: str, day, juice, anxiety, event: str = ""):
+        """Insert or replace the entry for a single day."""
+        raise NotImplementedError
+
+    def bulk_upsert(self, profile: str, frame: pd.DataFrame):
+        """
+        Merge many entries in one pass (last row per date wins, and wins
+        over what is already stored).  `frame` is passed through _normalise.
+        """
+        raise NotImplementedError
+
+    def compact(self, profile: str):
+        """Housekeeping hook; a no-op unless the backend needs it."""
+
+
+def _stat(path: Path):
+    """(path, mtime, size) of a file, or (path, None, None) if it is missing."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return str(path), None, None
+    return str(path), st.st_mtime_ns, st.st_size
+
+
+def _atomic_write(path: Path, write):
+    """
+    Produce `path` via `write(tmp_path)` + fsync + os.replace, so readers
+    (and a crash mid-write) only ever see the old or the new file.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write(tmp)
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def open_backend(kind: str, root: Path) -> Backend:
+    """Instantiate the backend named `kind` rooted at directory `root`."""
+    if kind == "csv":
+        from .csv_store import CsvBackend
+        return CsvBackend(root)
+    if kind == "sqlite":
+        from .sqlite_store import SqliteBackend
+        return SqliteBackend(root / "logs.sqlite3")
+    if kind == "parquet":
+        from .parquet_store import ParquetBackend
+        return ParquetBackend(root)
+    raise ValueError(f"Unknown STORAGE_BACKEND {kind!r} "
+                     "(expected 'csv', 'sqlite' or 'parquet')")
+
+
+def check_columns(frame: pd.DataFrame):
+    """Raise ValueError naming any REQUIRED column `frame` lacks."""
+    missing = [c for c in REQUIRED if c not in frame.columns]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+
+
+def _normalise(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce an imported batch to COLUMNS with day-precision dates and keep
+    the last row for each date (input order is write order).
+    """
+    check_columns(frame)
+    out = frame.reindex(columns=COLUMNS).copy()
+    out["date"]  = pd.to_datetime(out["date"]).dt.normalize()
+    out["event"] = out["event"].fillna("").astype(str)
+    return (out.drop_duplicates("date", keep="last")
+               .sort_values("date")
+               .reset_index(drop=True))
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast a loaded log to DTYPES (for whichever columns it has).  A blank
+    event is always "" (never NA), whichever backend it came from.
+    """
+    if "event" in df.columns:
+        df = df.assign(event=df["event"].fillna(""))
+    return df.astype({c: t for c, t in DTYPES.items() if c in df.columns})
+
+
+def _columns(columns=None) -> list[str]:
+    """Requested columns in canonical order, always led by "date"."""
+    if columns is None:
+        return list(COLUMNS)
+    return [c for c in COLUMNS if c == "date" or c in columns]
+
+
+def _window(df: pd.DataFrame, start=None, end=None, lookback: int = 0) -> pd.DataFrame:
+    """Rows inside [start, end] plus up to `lookback` rows just before start."""
+    if end is not None:
+        df = df[df["date"] <= pd.Timestamp(end)]
+    if start is not None:
+        first = int(df["date"].searchsorted(pd.Timestamp(start)))
+        df = df.iloc[max(first - lookback, 0):]
+    return df.reset_index(drop=True)
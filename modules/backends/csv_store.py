@@ -0,0 +1,436 @@
+# modules/backends/csv_store.py
+# ---------------------------------------------------------------------
+# One CSV per profile under a root directory.
+#
+#   <profile>.csv          sorted base file
+#   <profile>.journal.csv  append-only saves, folded into the base
+#                          once it holds JOURNAL_COMPACT_AT records
+#   <profile>.lock         flock'd by writers (saves, compaction)
+#   <profile>.quarantine.csv  malformed rows moved out of the log
+#
+# Writers serialise on the lock; readers never take it.  The base file
+# is only ever swapped in whole via os.replace, and each journal record
+# is a single O_APPEND write, so a reader sees either the old or the new
+# state and a crash cannot truncate the log.
+#
+# The base file is kept sorted with ISO dates at the start of every
+# line, so date-range reads bisect on byte offsets and parse only the
+# slice they need.
+#
+# Files are parsed against a fixed schema (DTYPES, ISO dates) by
+# pyarrow's multi-threaded CSV reader when it is installed.  Rows whose
+# date or scores are missing or do not parse, or that have surplus
+# fields, are never coerced: readers skip them, and the next writer that
+# rewrites the base moves them to the quarantine file.
+# ---------------------------------------------------------------------
+from contextlib import contextmanager
+from pathlib import Path
+import csv
+import importlib.util
+import io
+import logging
+import os
+import threading
+import pandas as pd
+
+from . import (Backend, COLUMNS, DTYPES, _atomic_write, _columns, _normalise, _stat,
+               _typed, _window)
+
+log = logging.getLogger(__name__)
+
+_HAVE_ARROW = importlib.util.find_spec("pyarrow") is not None
+
+try:
+    import fcntl
+except ImportError:                     # Windows: in-process locking only
+    fcntl = None
+
+
+def _side(path: Path, kind: str) -> Path:
+    """
+    Companion file of a base file: <profile>.<kind> next to a CSV and
+    <profile>.<ext>.<kind> next to any other format, so backends that
+    share a directory never share a journal, lock or quarantine file.
+    """
+    stem = path.stem if path.suffix == ".csv" else path.name
+    return path.with_name(f"{stem}.{kind}")
+
+
+# stem endings of files kept next to a profile's log (journal, quarantine,
+# metrics sidecar, lock)
+_COMPANIONS = (".journal", ".quarantine", ".metrics", ".lock")
+
+
+def _journal(path: Path) -> Path:
+    """Append-only journal that sits next to a base file."""
+    return _side(path, "journal.csv")
+
+
+def _quarantine_file(path: Path) -> Path:
+    return _side(path, "quarantine.csv")
+
+
+# ── schema-checked parsing ────────────────────────────────────────────────
+def _fast(source, usecols: list[str]) -> pd.DataFrame:
+    """Parse with the fixed schema; raises ValueError on any malformed value."""
+    if _HAVE_ARROW:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        types = {"date": pa.timestamp("ns"), "juice": pa.float32(),
+                 "anxiety": pa.float32(), "event": pa.string()}
+        table = pacsv.read_csv(source, convert_options=pacsv.ConvertOptions(
+            column_types=types, include_columns=usecols, include_missing_columns=True,
+            strings_can_be_null=True))                  # no "event" column: all null
+        event = pd.api.types.pandas_dtype(DTYPES["event"])
+        return table.to_pandas(types_mapper={pa.string(): event}.get)
+    # all columns: with usecols the C parser silently drops surplus fields
+    df = pd.read_csv(source, parse_dates=["date"], date_format="ISO8601", dtype=DTYPES)
+    return df.reindex(columns=usecols)
+
+
+def _validate(source, usecols: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Slow path: (rows that parse, malformed rows as read) from a raw text
+    parse.  A row is malformed if its date is missing or not ISO, a score
+    is missing or not a number, or it has more fields than the header.
+    Columns the header lacks read as blank (a missing "event" is fine).
+    """
+    surplus = []
+    raw = pd.read_csv(source, dtype=str, keep_default_na=False, engine="python",
+                      on_bad_lines=surplus.append)     # returns None: row is dropped
+    header = list(raw.columns)
+    raw = raw.reindex(columns=header + [c for c in usecols if c not in header], fill_value="")
+    out = raw[usecols].copy()
+    out["date"] = pd.to_datetime(raw["date"], format="ISO8601", errors="coerce")
+    ok = out["date"].notna()
+    for col in ("juice", "anxiety"):
+        if col in out:
+            out[col] = pd.to_numeric(raw[col], errors="coerce")
+            ok &= out[col].notna()
+    # keep surplus fields in the last column, so the quarantined row reads as written
+    n = len(header) - 1
+    surplus = pd.DataFrame([f[:n] + [",".join(f[n:])] for f in surplus], columns=header)
+    return _typed(out[ok].reset_index(drop=True)), pd.concat([raw[~ok], surplus])
+
+
+def _parse(source, usecols: list[str], bad: list | None = None) -> pd.DataFrame:
+    """
+    A log CSV (path or file object) as typed rows.  Malformed rows are
+    dropped and, if `bad` is given, appended to it as raw string rows.
+    """
+    try:
+        df = _fast(source, usecols)
+        scores = [c for c in ("juice", "anxiety") if c in df]
+        if (pd.api.types.is_datetime64_dtype(df["date"]) and df["date"].notna().all()
+                and not df[scores].isna().any().any()):
+            return df
+    except ValueError:                  # includes pyarrow.ArrowInvalid
+        pass
+    if hasattr(source, "seek"):
+        source.seek(0)
+    df, rejected = _validate(source, usecols)
+    if len(rejected):
+        log.warning("%s: skipping %d malformed row(s)", getattr(source, "name", "log"),
+                    len(rejected))
+        if bad is not None:
+            bad.append(rejected)
+    return df
+
+
+def _quarantine(path: Path, bad: list):
+    """Append malformed rows collected by _parse() to the profile's quarantine file."""
+    if not bad:
+        return
+    rows = pd.concat(bad, ignore_index=True)
+    target = _quarantine_file(path)
+    rows.to_csv(target, mode="a", index=False, header=not target.exists())
+
+
+def _fold(base: pd.DataFrame, journal: pd.DataFrame) -> pd.DataFrame:
+    """Overlay journal records on the base frame (last write per date wins)."""
+    if journal.empty:
+        return base
+    if base.empty:
+        merged = journal
+    else:
+        merged = pd.concat([base, journal], ignore_index=True)
+    if not pd.api.types.is_datetime64_dtype(merged["date"]):
+        merged["date"] = pd.to_datetime(merged["date"])
+    return (merged.drop_duplicates("date", keep="last")
+                  .sort_values("date")
+                  .reset_index(drop=True))
+
+
+_thread_locks = {}
+_registry_lock = threading.Lock()
+
+
+@contextmanager
+def _locked(path: Path):
+    """Exclusive per-profile writer lock, across threads and processes."""
+    with _registry_lock:
+        tlock = _thread_locks.setdefault(path, threading.Lock())
+    with tlock:
+        if fcntl is None:
+            yield
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(_side(path, "lock"), "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _append(journal: Path, row: list):
+    """Append one CSV record (plus header if the journal is new) in a single write."""
+    fd = os.open(journal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        buf = io.StringIO()
+        w = csv.writer(buf, lineterminator="\n")
+        if os.fstat(fd).st_size == 0:
+            w.writerow(COLUMNS)
+        w.writerow(row)
+        os.write(fd, buf.getvalue().encode())
+    finally:
+        os.close(fd)
+
+
+def _journal_len(journal: Path) -> int:
+    """Number of records in a journal (header excluded)."""
+    with open(journal, "rb") as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+# ── byte-offset index over a sorted base file ─────────────────────────────
+def _key(day) -> bytes:
+    return pd.Timestamp(day).strftime("%Y-%m-%d").encode()
+
+
+def _bisect(f, key: bytes, lo: int, hi: int) -> int:
+    """
+    Offset of the first line at or after `lo` whose date is >= key
+    (or `hi` if none).  `lo` must be a line start, `hi` a line start or EOF.
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(mid - 1)
+        f.readline()                    # jump to the first line start >= mid
+        pos = f.tell()
+        if pos >= hi:                   # no line starts in [mid, hi): step linearly
+            f.seek(lo)
+            line = f.readline()
+            if line[:10] >= key:
+                return lo
+            lo += len(line)
+            continue
+        line = f.readline()
+        if line[:10] >= key:
+            hi = pos
+        else:
+            lo = pos + len(line)
+    return lo
+
+
+def _rewind(f, pos: int, n: int, floor: int) -> int:
+    """Start of the line `n` lines before offset `pos` (never before `floor`)."""
+    span = 256 * max(n, 1)
+    while n > 0 and pos > floor:
+        a = max(floor, pos - span)
+        f.seek(a)
+        chunk = f.read(pos - a)
+        starts, k = [], len(chunk) - 1  # skip the newline that ends the line before pos
+        while len(starts) < n:
+            k = chunk.rfind(b"\n", 0, k)
+            if k < 0:
+                break
+            starts.append(a + k + 1)
+        if len(starts) == n:
+            return starts[-1]
+        if a == floor:
+            return floor
+        span *= 4
+    return pos
+
+
+_sorted_files = {}                      # base path → (its _stat(), lines in date order?)
+
+
+def _is_sorted(path: Path) -> bool:
+    """
+    Whether a base file's lines are in date order, checked once per file
+    version (files this backend wrote are recorded as sorted).  A file
+    edited by hand or dropped into the directory may not be.
+    """
+    stat = _stat(path)
+    known = _sorted_files.get(stat[0])
+    if known is not None and known[0] == stat:
+        return known[1]
+    with open(path, "rb") as f:
+        f.readline()
+        keys = [line[:10] for line in f if line.strip()]
+    ok = all(a <= b for a, b in zip(keys, keys[1:]))
+    _sorted_files[stat[0]] = (stat, ok)
+    return ok
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    """An unsorted base in date order (last row per date wins, as in _fold)."""
+    return (df.sort_values("date", kind="stable")
+              .drop_duplicates("date", keep="last")
+              .reset_index(drop=True))
+
+
+def _last_line(f, size: int, floor: int) -> bytes:
+    """Final non-empty line of a file (b"" if there are none past `floor`)."""
+    f.seek(max(floor, size - 4096))
+    lines = [ln for ln in f.read().splitlines() if ln.strip()]
+    return lines[-1] if lines and size > floor else b""
+
+
+class CsvBackend(Backend):
+    suffix = ".csv"                     # base file extension
+
+    def __init__(self, root: Path, compact_at: int | None = None):
+        self.root = Path(root)
+        if compact_at is None:
+            compact_at = int(os.getenv("JOURNAL_COMPACT_AT", "64"))
+        self.compact_at = compact_at
+
+    def location(self, profile: str) -> Path:
+        return self.root / f"{profile}{self.suffix}"
+
+    def profiles(self) -> list[str]:
+        # companions ("x.journal.csv", "x.metrics.parquet", …) and hidden
+        # temp files are not profiles; dotted nicknames ("j.doe") are
+        return sorted(p.stem for p in self.root.glob(f"*{self.suffix}")
+                      if not p.name.startswith(".") and not p.stem.endswith(_COMPANIONS))
+
+    def _ensure(self, profile: str) -> Path:
+        """If the profile file is missing, create a blank one with headers (writers only)."""
+        p = self.location(profile)
+        if not p.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._write_base(p, pd.DataFrame(columns=COLUMNS))
+        return p
+
+    def _write_base(self, path: Path, df: pd.DataFrame):
+        """
+        Atomically replace the sorted base file with `df`, written at
+        DTYPES precision ("5.1", not float32's "5.099999904632568").
+        """
+        df = _typed(df)
+        _atomic_write(path, lambda tmp: df.to_csv(tmp, index=False, date_format="%Y-%m-%d",
+                                                  float_format="%g"))
+        _sorted_files[str(path)] = (_stat(path), True)
+
+    def _base_span(self, path: Path) -> list:
+        """First and last date in the base file (empty if it has none)."""
+        if not path.exists():
+            return []
+        if not _is_sorted(path):
+            dates = self._read_base(path, None, None, ["date"], 0)["date"]
+            return [dates.min(), dates.max()] if len(dates) else []
+        with open(path, "rb") as f:
+            f.readline()
+            top, size = f.tell(), os.fstat(f.fileno()).st_size
+            first = f.readline()
+            last = _last_line(f, size, top)
+        dates = pd.to_datetime([d.decode()[:10] for d in (first, last) if d.strip()],
+                               format="ISO8601", errors="coerce")
+        return dates.dropna().tolist()
+
+    def _read_base(self, path: Path, start, end, usecols, lookback,
+                   bad: list | None = None) -> pd.DataFrame:
+        """Parse only the byte range of the base file that covers the window."""
+        if not path.exists():
+            return pd.DataFrame(columns=usecols)
+        if not _is_sorted(path):
+            # bisection would miss rows: parse it all and sort in memory
+            # (the next compaction writes it back sorted)
+            with open(path, "rb") as f:
+                return _sorted(_parse(f, usecols, bad))
+        if start is None and end is None:
+            with open(path, "rb") as f:
+                return _parse(f, usecols, bad)
+        with open(path, "rb") as f:
+            header = f.readline()
+            top, size = f.tell(), os.fstat(f.fileno()).st_size
+            lo = top if start is None else _bisect(f, _key(start), top, size)
+            hi = size if end is None else _bisect(
+                f, _key(pd.Timestamp(end) + pd.Timedelta(days=1)), lo, size)
+            lo = _rewind(f, lo, lookback, top)
+            f.seek(lo)
+            body = f.read(hi - lo)
+        return _parse(io.BytesIO(header + body), usecols, bad)
+
+    def _read(self, path: Path, start=None, end=None, columns=None,
+              lookback: int = 0, bad: list | None = None) -> pd.DataFrame:
+        usecols = _columns(columns)
+        # Journal first: compaction writes the new base *before* dropping the
+        # journal, so reading in this order never misses a saved entry.
+        try:
+            with open(_journal(path), "rb") as f:
+                journal = _parse(f, usecols, bad)
+        except FileNotFoundError:
+            journal = pd.DataFrame(columns=usecols)
+        base = self._read_base(path, start, end, usecols, lookback, bad)
+        return _typed(_window(_fold(base, journal), start, end, lookback))
+
+    def load(self, profile: str, start=None, end=None, columns=None,
+             lookback: int = 0) -> pd.DataFrame:
+        return self._read(self.location(profile), start, end, columns, lookback)
+
+    def version(self, profile: str):
+        path = self.location(profile)
+        return _stat(path), _stat(_journal(path))
+
+    def span(self, profile: str):
+        path = self.location(profile)
+        try:
+            journal = pd.read_csv(_journal(path), usecols=["date"], dtype=str)["date"]
+        except FileNotFoundError:
+            journal = pd.Series([], dtype=str)
+        journal = pd.to_datetime(journal, format="ISO8601", errors="coerce").dropna()
+        dates = pd.Series(self._base_span(path) + journal.tolist(), dtype="datetime64[ns]")
+        if dates.empty:
+            return None, None
+        return dates.min(), dates.max()
+
+    def upsert(self, profile: str, day, juice, anxiety, event: str = ""):
+        """Append one record to the journal; compact once it grows past compact_at."""
+        path = self.location(profile)
+        with _locked(path):
+            self._ensure(profile)
+            journal = _journal(path)
+            _append(journal, [pd.Timestamp(day).date().isoformat(), juice, anxiety, event])
+            if _journal_len(journal) >= self.compact_at:
+                self._compact(path)
+
+    def bulk_upsert(self, profile: str, frame: pd.DataFrame):
+        """Merge a batch into the stored log with one sorted merge and one write."""
+        batch = _typed(_normalise(frame))         # same dtypes as the stored rows
+        path = self.location(profile)
+        with _locked(path):
+            self._ensure(profile)
+            bad = []
+            self._write_base(path, _fold(self._read(path, bad=bad), batch))
+            _quarantine(path, bad)
+            _journal(path).unlink(missing_ok=True)     # folded into the new base
+
+    def compact(self, profile: str):
+        """Fold the journal into the sorted base file and drop the journal."""
+        path = self.location(profile)
+        with _locked(path):
+            self._compact(path)
+
+    def _compact(self, path: Path):
+        """compact() body; caller holds the profile lock."""
+        journal = _journal(path)
+        if not journal.exists():
+            return
+        bad = []
+        self._write_base(path, self._read(path, bad=bad))
+        _quarantine(path, bad)
+        journal.unlink()
@@ -0,0 +1,96 @@
+# modules/backends/parquet_store.py
+# ---------------------------------------------------------------------
+# CsvBackend with a columnar base file.
+#
+#   <profile>.parquet               sorted base, PARQUET_ROW_GROUP rows per group
+#   <profile>.parquet.journal.csv   append-only journal, as in the CSV backend
+#   <profile>.parquet.lock          writer lock
+#
+# The companion files carry the ".parquet" tag so they never collide
+# with a CSV profile of the same name in the same directory.
+#
+# Reads memory-map the file and decode only the requested columns of
+# the row groups whose min/max dates overlap the window (plus enough
+# earlier groups to cover the lookback), so a 90-day view of a long
+# history touches a couple of small groups instead of the whole log.
+# Saves still go to the journal; compaction rewrites the base.
+# ---------------------------------------------------------------------
+from pathlib import Path
+import os
+import pandas as pd
+import pyarrow.parquet as pq
+
+from . import COLUMNS, _atomic_write, _typed
+from .csv_store import CsvBackend
+
+
+def _empty() -> pd.DataFrame:
+    """Zero-row log with the real column types (so the schema is stored)."""
+    return _typed(pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"),
+                                "juice": [], "anxiety": [], "event": []}))
+
+
+def _groups(meta, start, end, lookback: int) -> list[int] | None:
+    """
+    Row groups that may hold rows in [start, end], plus earlier groups
+    until they hold at least `lookback` rows.  None = read everything
+    (no statistics to prune on).
+    """
+    col = meta.schema.names.index("date")
+    bounds = []
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(col).statistics
+        if stats is None or not stats.has_min_max:
+            return None
+        bounds.append((pd.Timestamp(stats.min), pd.Timestamp(stats.max)))
+    lo = 0 if start is None else sum(hi < pd.Timestamp(start) for _, hi in bounds)
+    hi = len(bounds) if end is None else sum(lo_ <= pd.Timestamp(end) for lo_, _ in bounds)
+    # groups are sorted, so the window is a contiguous run [lo, hi)
+    need = lookback
+    while need > 0 and lo > 0:
+        lo -= 1
+        need -= meta.row_group(lo).num_rows
+    return list(range(lo, max(hi, lo)))
+
+
+class ParquetBackend(CsvBackend):
+    suffix = ".parquet"
+
+    def __init__(self, root: Path, compact_at: int | None = None,
+                 row_group_size: int | None = None):
+        super().__init__(root, compact_at)
+        if row_group_size is None:
+            row_group_size = int(os.getenv("PARQUET_ROW_GROUP", "1024"))
+        self.row_group_size = row_group_size
+
+    def _write_base(self, path: Path, df: pd.DataFrame):
+        df = _empty() if df.empty else _typed(df[COLUMNS])
+        _atomic_write(path, lambda tmp: df.to_parquet(
+            tmp, index=False, row_group_size=self.row_group_size))
+
+    def _read_base(self, path: Path, start, end, usecols, lookback,
+                   bad: list | None = None) -> pd.DataFrame:
+        if not path.exists():
+            return pd.DataFrame(columns=usecols)
+        pf = pq.ParquetFile(path, memory_map=True)
+        groups = _groups(pf.metadata, start, end, lookback)
+        if groups is None:
+            table = pf.read(columns=usecols)
+        else:
+            table = pf.read_row_groups(groups, columns=usecols)
+        return table.to_pandas()
+
+    def _base_span(self, path: Path) -> list:
+        if not path.exists():
+            return []
+        meta = pq.ParquetFile(path, memory_map=True).metadata
+        if meta.num_rows == 0:
+            return []
+        groups = _groups(meta, None, None, 0)
+        if groups is None:
+            dates = pq.read_table(path, columns=["date"]).column("date").to_pandas()
+            return [dates.min(), dates.max()]
+        col = meta.schema.names.index("date")
+        first = meta.row_group(0).column(col).statistics.min
+        last = meta.row_group(meta.num_row_groups - 1).column(col).statistics.max
+        return [pd.Timestamp(first), pd.Timestamp(last)]
@@ -0,0 +1,122 @@
+# modules/backends/sqlite_store.py
+# ---------------------------------------------------------------------
+# All profiles in one SQLite database (WAL mode).
+#
+# Rows are keyed by PRIMARY KEY (profile, date), so an upsert is one
+# indexed INSERT … ON CONFLICT and date-range reads become index scans.
+# Each write also bumps the profile's row in `versions` in the same
+# transaction, so a save invalidates only that profile's caches.
+# ---------------------------------------------------------------------
+from pathlib import Path
+import os
+import sqlite3
+import threading
+import pandas as pd
+
+from . import Backend, _columns, _normalise, _typed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    profile TEXT NOT NULL,
+    date    TEXT NOT NULL,          -- ISO yyyy-mm-dd
+    juice   REAL,
+    anxiety REAL,
+    event   TEXT,
+    PRIMARY KEY (profile, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS versions (
+    profile TEXT PRIMARY KEY,
+    n       INTEGER NOT NULL        -- bumped by every write to the profile
+)
+"""
+
+_UPSERT = """
+INSERT INTO entries (profile, date, juice, anxiety, event)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (profile, date) DO UPDATE SET
+    juice   = excluded.juice,
+    anxiety = excluded.anxiety,
+    event   = excluded.event
+"""
+
+_BUMP = """
+INSERT INTO versions (profile, n) VALUES (?, 1)
+ON CONFLICT (profile) DO UPDATE SET n = n + 1
+"""
+
+
+def _iso(day) -> str:
+    return pd.Timestamp(day).date().isoformat()
+
+
+class SqliteBackend(Backend):
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (and per process after a fork)."""
+        pid, conn = getattr(self._local, "conn", (None, None))
+        if conn is None or pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = (os.getpid(), conn)
+        return conn
+
+    def location(self, profile: str) -> Path:
+        return self.path
+
+    def profiles(self) -> list[str]:
+        rows = self._conn().execute("SELECT DISTINCT profile FROM entries ORDER BY profile")
+        return [r[0] for r in rows]
+
+    def load(self, profile: str, start=None, end=None, columns=None,
+             lookback: int = 0) -> pd.DataFrame:
+        cols = ", ".join(_columns(columns))
+        sql, params = f"SELECT {cols} FROM entries WHERE profile = ?", [profile]
+        if start is not None:
+            sql += " AND date >= ?"
+            params.append(_iso(start))
+        if end is not None:
+            sql += " AND date <= ?"
+            params.append(_iso(end))
+        if start is not None and lookback > 0:
+            # newest `lookback` rows before the window, via the same index
+            sql = (f"SELECT * FROM (SELECT {cols} FROM entries WHERE profile = ? AND date < ?"
+                   f" ORDER BY date DESC LIMIT ?) UNION ALL {sql}")
+            params = [profile, _iso(start), lookback] + params
+        sql = f"SELECT * FROM ({sql}) ORDER BY date"
+        return _typed(pd.read_sql_query(sql, self._conn(), params=params, parse_dates=["date"]))
+
+    def version(self, profile: str):
+        # per-profile write counter: other profiles' saves leave it alone
+        row = self._conn().execute(
+            "SELECT n FROM versions WHERE profile = ?", (profile,)).fetchone()
+        return str(self.path), profile, row[0] if row else 0
+
+    def span(self, profile: str):
+        first, last = self._conn().execute(
+            "SELECT MIN(date), MAX(date) FROM entries WHERE profile = ?", (profile,)
+        ).fetchone()
+        if first is None:
+            return None, None
+        return pd.Timestamp(first), pd.Timestamp(last)
+
+    def upsert(self, profile: str, day, juice, anxiety, event: str = ""):
+        with self._conn() as conn:          # commits on success
+            conn.execute(_UPSERT, (profile, _iso(day), juice, anxiety, event or None))
+            conn.execute(_BUMP, (profile,))
+
+    def bulk_upsert(self, profile: str, frame: pd.DataFrame):
+        """All rows in one transaction through the same indexed upsert."""
+        batch = _normalise(frame)
+        rows = zip([profile] * len(batch),
+                   batch["date"].dt.strftime("%Y-%m-%d"),
+                   batch["juice"].astype(float), batch["anxiety"].astype(float),
+                   batch["event"].replace("", None))
+        with self._conn() as conn:
+            conn.executemany(_UPSERT, rows)
+            conn.execute(_BUMP, (profile,))
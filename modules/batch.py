@@ -0,0 +1,116 @@
+# modules/batch.py
+# ---------------------------------------------------------------------
+# Headless board decks for every profile under DATA_DIR.
+#
+#   python -m modules.cli decks [--workers N] [--days 90] [--out DIR]
+#
+# Each profile runs in a worker process (load → metrics → Juice/Anxiety
+# PNG → deck) and lands in <out>/<nickname>/.  <out>/manifest.json keeps
+# a hash of the data each deck was built from, so profiles whose window
+# has not changed since the last run are skipped.
+# ---------------------------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+
+OUT_DIR  = Path(os.getenv("REPORT_DIR", "report_exports"))
+MANIFEST = "manifest.json"
+
+
+@dataclass
+class Result:
+    profile: str
+    status: str                 # "built", "unchanged", "empty" or "failed"
+    seconds: float
+    path: str | None = None
+    digest: str | None = None
+    error: str | None = None
+
+
+def data_hash(raw: pd.DataFrame, days: int | None) -> str:
+    """Content hash of the rows a deck is built from."""
+    h = hashlib.sha1(str(days).encode())
+    h.update(pd.util.hash_pandas_object(raw, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _window(profile: str, days: int | None) -> tuple[pd.DataFrame, pd.Timestamp | None]:
+    """Raw rows for the last `days` (plus the metrics lookback) and the window start."""
+    from modules import storage
+    from modules.metrics import LOOKBACK
+    backend, profile = storage.backend_for(profile)
+    _, last = backend.span(profile)
+    start = None
+    if days is not None and last is not None:
+        start = last - pd.Timedelta(days=days - 1)
+    return backend.load(profile, start=start, lookback=LOOKBACK), start
+
+
+def build_one(profile: str, out_dir: Path, days: int | None = 90,
+              previous: str | None = None) -> Result:
+    """Build `profile`'s deck unless its data still hashes to `previous`."""
+    t0 = time.perf_counter()
+    try:
+        raw, start = _window(profile, days)
+        if raw.empty:
+            return Result(profile, "empty", time.perf_counter() - t0)
+        digest = data_hash(raw, days)
+        if digest == previous:
+            return Result(profile, "unchanged", time.perf_counter() - t0, digest=digest)
+
+        from modules import metrics, render
+        from modules.report import KPI_METRICS, build_deck, deck_filename
+        from modules.ui import charts
+        df = metrics.compute(raw, KPI_METRICS)
+        if start is not None:
+            df = df[df["date"] >= start].reset_index(drop=True)
+        chart, _ = charts.juice_anxiety_chart(df, export=False)
+        deck = build_deck(df, {"juice_anx": render.to_png(chart, scale=2)})
+
+        path = out_dir / profile / deck_filename(df)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(deck)
+        return Result(profile, "built", time.perf_counter() - t0, str(path), digest)
+    except Exception as e:
+        return Result(profile, "failed", time.perf_counter() - t0, error=f"{type(e).__name__}: {e}")
+
+
+def build_all(profiles=None, out_dir: Path = OUT_DIR, workers: int | None = None,
+              days: int | None = 90, force: bool = False, report=None) -> list[Result]:
+    """
+    Decks for `profiles` (default: all) across a process pool of `workers`
+    (default: CPU count).  `report(result)` is called as each one finishes;
+    `force` rebuilds even unchanged profiles.
+    """
+    from modules import storage
+    out_dir = Path(out_dir)
+    if profiles is None:
+        profiles = storage.profiles()
+    manifest_path = out_dir / MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    def previous(profile):
+        entry = manifest.get(profile)
+        if force or not entry or not Path(entry["file"]).exists():
+            return None
+        return entry["hash"]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_one, p, out_dir, days, previous(p)) for p in profiles]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results.append(res)
+            if res.status == "built":
+                manifest[res.profile] = {"hash": res.digest, "file": res.path}
+            if report:
+                report(res)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return sorted(results, key=lambda r: r.profile)
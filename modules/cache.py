@@ -0,0 +1,69 @@
+# modules/cache.py
+# ---------------------------------------------------------------------
+# Process-wide LRU shared by every Streamlit session / rerun.
+#
+# Entries are filed under a *tag* (one per profile) and keyed by a data
+# version token — for files that is (path, mtime, size) — so a write
+# from any process produces a new key, and writes from this process
+# also drop the tag's entries eagerly via invalidate().
+#
+# Cached frames are shared between callers: treat them as read-only.
+# ---------------------------------------------------------------------
+from collections import OrderedDict
+import os
+import threading
+
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", "256"))
+
+
+class LRU:
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tag, key, build):
+        """Return the value cached under (tag, key), building it on a miss."""
+        full = (tag, key)
+        with self._lock:
+            if full in self._data:
+                self._data.move_to_end(full)
+                return self._data[full]
+        value = build()                 # outside the lock: may be slow
+        with self._lock:
+            self._data[full] = value
+            self._data.move_to_end(full)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def invalidate(self, tag):
+        """Forget every entry filed under `tag`."""
+        with self._lock:
+            for full in [k for k in self._data if k[0] == tag]:
+                del self._data[full]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_shared = LRU()
+
+
+def memo(version, key, build):
+    """
+    Memoize `build()` against a data version from storage.data_version().
+
+    `version` is (tag, token); `key` distinguishes results derived from
+    the same data (e.g. ("compute", start)).
+    """
+    tag, token = version
+    return _shared.get(tag, (token, key), build)
+
+
+def invalidate(tag):
+    _shared.invalidate(tag)
@@ -0,0 +1,84 @@
+# modules/cli.py
+# ---------------------------------------------------------------------
+# Admin command line for data that lives under DATA_DIR.
+#
+#   python -m modules.cli import <nickname> history.csv   # or .jsonl
+#   python -m modules.cli convert [--to parquet] [--force] [nickname ...]
+#   python -m modules.cli decks [--workers N] [--days 90] [nickname ...]
+# ---------------------------------------------------------------------
+from pathlib import Path
+import argparse
+import sys
+import time
+
+from modules import storage
+
+
+def _import(args) -> int:
+    n = storage.import_file(args.file, profile=args.nickname, chunksize=args.chunksize)
+    print(f"merged {n} day(s) into {storage.data_file(args.nickname)}")
+    return 0
+
+
+def _convert(args) -> int:
+    copied = storage.convert(args.to, args.nicknames or None, args.force)
+    for profile, n in copied.items():
+        print(f"{profile}: " + ("already converted, skipped (--force to overwrite)"
+                                if n is None else f"{n} row(s)"))
+    done = sum(n is not None for n in copied.values())
+    print(f"converted {done} profile(s) to {args.to}, skipped {len(copied) - done}")
+    return 0
+
+
+def _decks(args) -> int:
+    from modules import batch           # pulls in pptx / charts only when used
+
+    def report(res):
+        line = f"{res.profile:<24} {res.status:<10} {res.seconds:>7.2f} s"
+        print(line + f"  {res.path or res.error or ''}", flush=True)
+
+    t0 = time.perf_counter()
+    results = batch.build_all(args.nicknames or None, args.out or batch.OUT_DIR,
+                              args.workers, args.days or None, args.force, report)
+    built  = sum(r.status == "built" for r in results)
+    failed = sum(r.status == "failed" for r in results)
+    print(f"{built} built, {len(results) - built - failed} skipped, {failed} failed "
+          f"in {time.perf_counter() - t0:.1f} s")
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m modules.cli")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="merge a CSV/JSONL history into a profile")
+    imp.add_argument("nickname")
+    imp.add_argument("file", help="columns: date, juice, anxiety[, event]")
+    imp.add_argument("--chunksize", type=int, default=100_000)
+    imp.set_defaults(func=_import)
+
+    conv = sub.add_parser("convert", help="copy CSV profiles into another storage backend")
+    conv.add_argument("nicknames", nargs="*", help="default: every profile except the demo")
+    conv.add_argument("--to", default="parquet", choices=["parquet", "sqlite"])
+    conv.add_argument("--force", action="store_true",
+                      help="overwrite profiles the target already holds with the CSV data")
+    conv.set_defaults(func=_convert)
+
+    decks = sub.add_parser("decks", help="build a board deck for every profile")
+    decks.add_argument("nicknames", nargs="*", help="default: every profile except the demo")
+    decks.add_argument("--workers", type=int, default=None, help="default: CPU count")
+    decks.add_argument("--days", type=int, default=90, help="history window, 0 = all time")
+    decks.add_argument("--out", type=Path, default=None, help="default: REPORT_DIR")
+    decks.add_argument("--force", action="store_true", help="rebuild unchanged profiles too")
+    decks.set_defaults(func=_decks)
+
+    args = ap.parse_args(argv)
+    try:
+        return args.func(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
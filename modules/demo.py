@@ -0,0 +1,68 @@
+# modules/demo.py
+# ---------------------------------------------------------------------
+# Process-wide cache of everything the demo profile renders.
+#
+# Every visitor without a nickname sees the same read-only DEMO_FILE, so
+# its parsed log, metrics, chart specs and board deck are built
+# once per process (per history window) under a lock and then shared by
+# all sessions.  Replacing the file (new mtime / size) rebuilds them on
+# next use.
+# ---------------------------------------------------------------------
+from dataclasses import dataclass, field
+import threading
+import pandas as pd
+
+from modules import metrics, storage
+
+_lock    = threading.Lock()
+_bundles = {}                   # (demo version, days) → Bundle
+
+
+@dataclass
+class Bundle:
+    raw: pd.DataFrame           # parsed window (+ metrics lookback)
+    metrics: pd.DataFrame       # compute() trimmed to the window
+    charts: dict                # charts.build() → Vega-Lite specs
+    _deck: bytes | None = None
+    # its own lock: a slow first deck must not block bundle() for other windows
+    _deck_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def deck(self) -> bytes:
+        """Board deck bytes, built on first request."""
+        with self._deck_lock:
+            if self._deck is None:
+                from modules.report import build_deck   # python-pptx: load on demand
+                from modules.ui.charts import deck_png
+                self._deck = build_deck(self.metrics, {"juice_anx": deck_png(self.metrics)})
+        return self._deck
+
+
+def _build(days: int | None) -> Bundle:
+    from modules.ui import charts
+    backend, profile = storage.demo_backend()
+    _, last = backend.span(profile)
+    start = None
+    if days is not None and last is not None:
+        start = last - pd.Timedelta(days=days - 1)
+    raw = backend.load(profile, start=start, lookback=metrics.LOOKBACK)
+    out = metrics.compute(raw)
+    if start is not None:
+        out = out[out["date"] >= start].reset_index(drop=True)
+    return Bundle(raw, out, charts.build(out) if len(out) else {})
+
+
+def bundle(days: int | None = 90) -> Bundle:
+    """The shared demo bundle for a history window of `days` (None = all)."""
+    backend, profile = storage.demo_backend()
+    version = backend.version(profile)
+    key = (version, days)
+    found = _bundles.get(key)
+    if found is None:
+        with _lock:
+            found = _bundles.get(key)
+            if found is None:
+                found = _build(days)
+                for stale in [k for k in _bundles if k[0] != version]:
+                    del _bundles[stale]
+                _bundles[key] = found
+    return found
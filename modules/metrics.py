@@ -6,65 +6,295 @@
 # OUTPUT : Same rows plus derived metrics
 # ---------------------------------------------------------------------
 
+from dataclasses import dataclass
+from typing import Callable
 import pandas as pd
 import numpy as np
 
+# Longest trailing window any metric reads (fortitude's 30 entries).
+# Loading this many rows before a date range makes every derived value
+# inside the range identical to a full-history compute (apart from the
+# arbitrary origin of the helper `days` column).
+LOOKBACK = 30
 
-def _days_since_start(series: pd.Series) -> pd.Series:
-    """Return float days from first date in series."""
-    seconds = (series - series.iloc[0]).dt.total_seconds()
+# Bump whenever a formula or the DERIVED list changes: persisted metrics
+# (modules.sidecar) from another engine version are recomputed.
+ENGINE_VERSION = 1
+
+# derived columns, in the order compute() adds them
+DERIVED = ["gq", "sd", "days", "dJdt", "dgqdt", "focus_flux",
+           "dgqdt_7d", "sigma", "fortitude", "gq_delta", "focus_flux_delta"]
+
+# Derived values are shown to two decimals at most, so they are stored as
+# float32 (half the memory of float64); the arithmetic itself runs in float64.
+DERIVED_DTYPE = "float32"
+
+
+def _days_since(series: pd.Series, origin: pd.Timestamp) -> pd.Series:
+    """Return float days from `origin`."""
+    seconds = (series - origin).dt.total_seconds()
     return seconds / 86_400  # seconds → days
 
 
-def compute(df: pd.DataFrame) -> pd.DataFrame:
+def _diff(series: pd.Series, pos: np.ndarray | None) -> pd.Series:
+    """series.diff(), blanked at the first row of every group."""
+    d = series.diff()
+    return d if pos is None else d.mask(pos == 0)
+
+
+def _rolling(series: pd.Series, window: int, min_periods: int, how: str,
+             pos: np.ndarray | None = None) -> np.ndarray:
+    """
+    Trailing-window sum / mean / std (ddof=1) that skips NaNs.
+
+    `pos` is each row's index within its group (compute_many); windows
+    never reach back past the start of a row's group.
+
+    Each row only ever sees its own window, summed in a fixed lag order,
+    so its value does not depend on how much history precedes it (pandas'
+    running sums drift in the last bits).  That is what lets
+    compute_incremental splice a recomputed tail in bit for bit.
     """
-    Add all derived psychic‑physics metrics.
+    x = series.to_numpy(dtype=float)
+    n = len(x)
+    valid = ~np.isnan(x)
+    vals = np.where(valid, x, 0.0)
+    if pos is None:
+        pos = np.arange(n)
+
+    # ok[lag][i]: row i - lag is a usable value in row i's group
+    ok = [valid[:n - lag] & (pos[lag:] >= lag) for lag in range(min(window, n))]
+    total, count = np.zeros(n), np.zeros(n)
+    for lag, m in enumerate(ok):
+        total[lag:] += np.where(m, vals[:n - lag], 0.0)
+        count[lag:] += m
+
+    if how == "sum":
+        res = total
+    else:
+        res = total / np.maximum(count, 1)
+        if how == "std":
+            sq = np.zeros(n)
+            for lag, m in enumerate(ok):
+                dev = vals[:n - lag] - res[lag:]
+                sq[lag:] += np.where(m, dev * dev, 0.0)
+            res = np.sqrt(sq / np.maximum(count - 1, 1))
+    return np.where(count >= min_periods, res, np.nan)
+
+
+# ── metric registry ──────────────────────────────────────────────────────
+# Each metric declares the columns it reads and how many earlier entries
+# it looks at; compute(df, metrics=[...]) evaluates only the requested
+# ones plus whatever they depend on.  Functions get a dict of float64
+# inputs (raw values: display NaN-filling happens at the very end) and
+# a context with "date", "origin" and "pos" (see _derive).
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    inputs: tuple[str, ...]
+    window: int                 # earlier entries read per row (0 = row-wise)
+    fn: Callable
+    fill: bool = False          # NaN → 0 for display
+
+
+METRICS: dict[str, Metric] = {}
+
+
+def metric(name: str, inputs, window: int = 0, fill: bool = False):
+    """Register `fn(cols, ctx)` as the metric `name`."""
+    def wrap(fn):
+        METRICS[name] = Metric(name, tuple(inputs), window, fn, fill)
+        return fn
+    return wrap
+
+
+# -----------------------------------------------------------------
+# Core ratios / differences
+# -----------------------------------------------------------------
+@metric("gq", ["juice", "anxiety"])
+def _gq(c, ctx):
+    return c["juice"] / c["anxiety"].replace(0, np.nan)
+
+@metric("sd", ["juice", "anxiety"])
+def _sd(c, ctx):
+    return c["juice"] - c["anxiety"]                        # hidden but useful
+
+# -----------------------------------------------------------------
+# Time axis & first derivatives
+# -----------------------------------------------------------------
+@metric("days", [])
+def _days(c, ctx):
+    return _days_since(ctx["date"], ctx["origin"])
+
+@metric("dJdt", ["juice", "days"], window=1, fill=True)
+def _djdt(c, ctx):                                          # Juice velocity
+    return _diff(c["juice"], ctx["pos"]) / _diff(c["days"], ctx["pos"])
+
+@metric("dgqdt", ["gq", "days"], window=1, fill=True)
+def _dgqdt(c, ctx):                                         # GQ slope
+    return _diff(c["gq"], ctx["pos"]) / _diff(c["days"], ctx["pos"])
+
+# Signed momentum: only "productive" if surplus drive is positive
+@metric("focus_flux", ["dJdt", "sd"], fill=True)
+def _focus_flux(c, ctx):
+    return c["dJdt"] * np.sign(c["sd"])
+
+# -----------------------------------------------------------------
+# Rolling & cumulative stats
+# -----------------------------------------------------------------
+@metric("dgqdt_7d", ["dgqdt"], window=6, fill=True)
+def _dgqdt_7d(c, ctx):
+    return _rolling(c["dgqdt"], window=7, min_periods=2, how="mean", pos=ctx["pos"])
+
+@metric("sigma", ["juice"], window=3, fill=True)
+def _sigma(c, ctx):
+    return _rolling(c["juice"], window=4, min_periods=2, how="std", pos=ctx["pos"])
+
+@metric("fortitude", ["sd"], window=29)
+def _fortitude(c, ctx):
+    return _rolling(c["sd"].clip(lower=0),                  # only positive surplus
+                    window=30, min_periods=1, how="sum", pos=ctx["pos"])
+
+# -----------------------------------------------------------------
+# Change since the previous entry (KPI arrows); 0 on the first entry
+# -----------------------------------------------------------------
+@metric("gq_delta", ["gq"], window=1, fill=True)
+def _gq_delta(c, ctx):
+    return _diff(c["gq"], ctx["pos"])
+
+@metric("focus_flux_delta", ["focus_flux"], window=1, fill=True)
+def _focus_flux_delta(c, ctx):
+    return _diff(c["focus_flux"].fillna(0), ctx["pos"])    # vs the displayed value
+
+
+def requires(names) -> list[str]:
+    """`names` plus every metric they depend on, in DERIVED order."""
+    need, todo = set(), list(names)
+    while todo:
+        name = todo.pop()
+        if name not in METRICS:
+            raise KeyError(f"unknown metric {name!r}")
+        if name not in need:
+            need.add(name)
+            todo.extend(i for i in METRICS[name].inputs if i in METRICS)
+    return [m for m in DERIVED if m in need]
+
+
+def lookback(names) -> int:
+    """Earlier entries needed for `names` to be exact from the first row."""
+    depth = {}
+    for name in requires(names):
+        m = METRICS[name]
+        depth[name] = m.window + max((depth.get(i, 0) for i in m.inputs), default=0)
+    return max((depth[n] for n in names), default=0)
+
+
+def _derive(out: pd.DataFrame, origin, pos: np.ndarray | None = None,
+            names=None) -> None:
+    """
+    Add the DERIVED columns (or just `names`) to a date-sorted frame,
+    in place.
+
+    For several profiles at once, `out` is sorted by (profile, date),
+    `origin` holds each row's profile start date and `pos` each row's
+    index within its profile.
+    """
+    names = DERIVED if names is None else [m for m in requires(names) if m in set(names)]
+    cols = {"juice": out["juice"].astype("float64"),
+            "anxiety": out["anxiety"].astype("float64")}
+    ctx = {"date": out["date"], "origin": origin, "pos": pos}
+    for name in requires(names):
+        cols[name] = pd.Series(METRICS[name].fn(cols, ctx), index=out.index)
+
+    for name in names:
+        col = cols[name].fillna(0) if METRICS[name].fill else cols[name]
+        out[name] = col.astype(DERIVED_DTYPE)
+
+
+def compute(df: pd.DataFrame, metrics=None) -> pd.DataFrame:
+    """
+    Add all derived psychic‑physics metrics, or only the `metrics` named
+    (their dependencies are evaluated but not added).
 
     Columns created
     ---------------
-    gq        – Gumption Quotient (Juice ÷ Anxiety)
-    sd        – Surplus Drive    (Juice − Anxiety)      [hidden KPI]
+    gq        – Gumption Quotient (Juice ÷ Anxiety)
+    sd        – Surplus Drive    (Juice − Anxiety)      [hidden KPI]
     dJdt      – First derivative of Juice (per day)
     focus_flux– Φf  = dJdt · sign(sd)                   (momentum)
     dgqdt     – Instant slope of GQ (per day)
     dgqdt_7d  – 7‑day moving average of dgqdt
     sigma     – Rolling 4‑entry σ of Juice  (Focus‑Entropy)
     fortitude – 30‑day running sum of positive sd (Fortitude Farad)
+    gq_delta, focus_flux_delta – change since the previous entry
+    """
+    if metrics is not None:
+        requires(metrics)                   # unknown names raise KeyError, even on no data
+    if df.empty:
+        return df.copy()
+
+    out = df.sort_values("date").reset_index(drop=True).copy()
+    _derive(out, out["date"].iloc[0], names=metrics)
+    return out
+
+
+def row_at(out: pd.DataFrame, day) -> pd.Series:
+    """
+    Row of a compute() result for `day`, or the last entry before it
+    (the first row if `day` precedes them all).  Binary search on the
+    sorted dates, so it costs O(log n) instead of a scan.
+    """
+    pos = int(out["date"].searchsorted(pd.Timestamp(day), side="right")) - 1
+    return out.iloc[max(pos, 0)]
+
+
+def compute_many(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    compute() for a long frame holding many profiles (a "profile" column),
+    in one vectorised pass.  Rows come back sorted by (profile, date) and
+    each profile's slice equals compute() on that profile alone.
     """
     if df.empty:
         return df.copy()
 
+    out = df.sort_values(["profile", "date"]).reset_index(drop=True).copy()
+    profile = out["profile"]
+    starts = np.flatnonzero(profile.ne(profile.shift()).to_numpy())
+    sizes = np.diff(np.append(starts, len(out)))
+    first = np.repeat(starts, sizes)                  # each row's group start
+    pos = np.arange(len(out)) - first
+    origin = pd.Series(out["date"].to_numpy()[first], index=out.index)
+    _derive(out, origin, pos)
+    return out
+
+
+def compute_incremental(prev_out: pd.DataFrame, df: pd.DataFrame,
+                        changed_dates) -> pd.DataFrame:
+    """
+    Same result as compute(df), recomputing only the rows an edit can touch.
+
+    prev_out      – an earlier compute() result
+    df            – the raw log after the edit(s)
+    changed_dates – dates inserted or updated since prev_out was computed
+
+    Rows before the earliest changed date are copied from prev_out; the
+    rest is recomputed with LOOKBACK rows of context.
+    """
+    if len(changed_dates) == 0:
+        return prev_out.copy()
+    if prev_out.empty or df.empty:
+        return compute(df)
+
     out = df.sort_values("date").reset_index(drop=True).copy()
+    first = pd.to_datetime(pd.Series(list(changed_dates))).min()
+    split = int(out["date"].searchsorted(first))
+    start = split - LOOKBACK
+    if start <= 0:
+        return compute(df)
 
-    # -----------------------------------------------------------------
-    # Core ratios / differences
-    # -----------------------------------------------------------------
-    out["gq"] = out["juice"] / out["anxiety"].replace(0, np.nan)
-    out["sd"] = out["juice"] - out["anxiety"]                 # hidden but useful
-
-    # -----------------------------------------------------------------
-    # Time axis & first derivatives
-    # -----------------------------------------------------------------
-    out["days"] = _days_since_start(out["date"])
-    out["dJdt"] = out["juice"].diff() / out["days"].diff()    # Juice velocity
-    out["dgqdt"] = out["gq"].diff() / out["days"].diff()      # GQ slope
-
-    # Signed momentum: only "productive" if surplus drive is positive
-    out["focus_flux"] = out["dJdt"] * np.sign(out["sd"])
-
-    # -----------------------------------------------------------------
-    # Rolling & cumulative stats
-    # -----------------------------------------------------------------
-    out["dgqdt_7d"] = out["dgqdt"].rolling(window=7, min_periods=2).mean()
-    out["sigma"]    = out["juice"].rolling(window=4,  min_periods=2).std()
-    out["fortitude"] = (
-        out["sd"].clip(lower=0)           # only positive surplus
-            .rolling(window=30, min_periods=1)
-            .sum()
-    )
-
-    # replace single-row NaNs with 0 for display purposes
-    for col in ["dJdt", "dgqdt", "dgqdt_7d", "focus_flux", "sigma"]:
-        out[col] = out[col].fillna(0)
-
-    return out
\ No newline at end of file
+    tail = out.iloc[start:].copy()
+    _derive(tail, out["date"].iloc[0])
+    for col in DERIVED:
+        out[col] = np.concatenate([prev_out[col].to_numpy()[:split],
+                                   tail[col].to_numpy()[split - start:]])
+    return out
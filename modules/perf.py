@@ -0,0 +1,64 @@
+# modules/perf.py
+# ---------------------------------------------------------------------
+# Lightweight per-rerun timing.
+#
+#   perf.begin(profile)            # top of app.py
+#   with perf.span("compute"):     # around each hot-path step
+#       ...
+#   record = perf.end(rows=len(df))
+#
+# Each finished rerun becomes one JSON line
+#   {"ts": …, "profile": …, "rows": …, "total_ms": …, "spans": {name: ms}}
+# appended to $PERF_LOG (if set) and logged on the "perf" logger.
+# PERF_PANEL=1 shows the same record in an in-app expander.
+# ---------------------------------------------------------------------
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+import time
+
+PERF_LOG   = os.getenv("PERF_LOG")
+PERF_PANEL = os.getenv("PERF_PANEL", "") == "1"
+
+log = logging.getLogger("perf")
+
+_local     = threading.local()          # one rerun per script thread
+_file_lock = threading.Lock()
+
+
+def begin(profile: str | None):
+    """Start a new per-rerun record."""
+    _local.run = {"ts": time.time(), "profile": profile, "spans": {}}
+    _local.t0 = time.perf_counter()
+
+
+@contextmanager
+def span(name: str):
+    """Time the enclosed block; repeated names accumulate."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        run = getattr(_local, "run", None)
+        if run is not None:
+            ms = (time.perf_counter() - t0) * 1e3
+            run["spans"][name] = round(run["spans"].get(name, 0.0) + ms, 3)
+
+
+def end(rows: int | None = None) -> dict | None:
+    """Close the current record, emit it and return it (None if never begun)."""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return None
+    _local.run = None
+    run["rows"] = rows
+    run["total_ms"] = round((time.perf_counter() - _local.t0) * 1e3, 3)
+
+    line = json.dumps(run)
+    log.info(line)
+    if PERF_LOG:
+        with _file_lock, open(PERF_LOG, "a") as f:
+            f.write(line + "\n")
+    return run
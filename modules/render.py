@@ -0,0 +1,40 @@
+# modules/render.py
+# ---------------------------------------------------------------------
+# Altair chart → PNG bytes via vl-convert (no selenium, no browser).
+#
+# vl-convert is imported on the first render (i.e. the first deck), not
+# when the app starts; its JavaScript engine then stays warm for the life
+# of the process.  Output is memoized on a digest of the full Vega-Lite
+# spec (inline data included), so reruns that produce an identical chart
+# never render twice.
+# ---------------------------------------------------------------------
+import hashlib
+import json
+import os
+
+import altair as alt
+
+from modules.cache import LRU
+
+_pngs = LRU(maxsize=int(os.getenv("PNG_CACHE_SIZE", "64")))
+
+# "v5.20.1" → "5.20": the Vega-Lite release altair generated the spec for
+_VL_VERSION = ".".join(alt.SCHEMA_VERSION.lstrip("v").split(".")[:2])
+
+
+def spec_hash(spec: dict) -> str:
+    """Stable digest of a Vega-Lite spec dict."""
+    blob = json.dumps(spec, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def to_png(chart: alt.TopLevelMixin, scale: float = 2) -> bytes:
+    """Render `chart` to PNG, reusing the cached bytes for an identical spec."""
+    spec = chart.to_dict()
+
+    def _render():
+        import vl_convert as vlc
+        return vlc.vegalite_to_png(spec, vl_version=_VL_VERSION, scale=scale)
+
+    return _pngs.get("png", (spec_hash(spec), scale), _render)
+
@@ -3,13 +3,22 @@ from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
 from pptx.dml.color import RGBColor
-from pathlib import Path
+import hashlib
+import io
+import pandas as pd
+
+from modules.cache import LRU
 
 
 GREEN  = RGBColor(0x0C, 0xAA, 0x41)
 YELLOW = RGBColor(0xE9, 0xB8, 0x00)
 RED    = RGBColor(0xD4, 0x26, 0x26)
 
+_decks = LRU(maxsize=32)
+
+# derived columns build_deck() reads (for metrics.compute(df, KPI_METRICS))
+KPI_METRICS = ["gq", "focus_flux", "sigma", "fortitude"]
+
 
 def _kpi_colour(label, value):
     if label == "GQ":
@@ -23,11 +32,13 @@ def _kpi_colour(label, value):
     return RGBColor(0, 0, 0)
 
 
-def build_deck(df, chart_paths, out_dir="report_exports"):
-    Path(out_dir).mkdir(exist_ok=True)
-    end_date = df.date.max().date()
-    out_path = Path(out_dir) / f"Psychic_KPIs_{end_date}.pptx"
+def deck_filename(df) -> str:
+    """Download name for the deck covering `df`."""
+    return f"Psychic_KPIs_{df.date.max().date()}.pptx"
+
 
+def build_deck(df, chart_images) -> bytes:
+    """Build the KPI board deck in memory; `chart_images` maps name → PNG bytes."""
     prs = Presentation()
 
     # -- Slide 1 : Title ----------------------------------------------------
@@ -86,13 +97,13 @@ def build_deck(df, chart_paths, out_dir="report_exports"):
        .text_frame.text = comment
 
     # --- Slide 3 : Trend overview chart -------------------------------------
-    chart_file = chart_paths.get("juice_anx")
-    if chart_file and Path(chart_file).is_file():
+    chart_png = chart_images.get("juice_anx")
+    if chart_png:
         s2 = prs.slides.add_slide(prs.slide_layouts[5])
         s2.shapes.title.text = "Juice vs. Anxiety Trend"
 
         # add at natural size first
-        pic = s2.shapes.add_picture(str(chart_file), Inches(0.4), Inches(1.5))
+        pic = s2.shapes.add_picture(io.BytesIO(chart_png), Inches(0.4), Inches(1.5))
 
         # calculate max allowed height (slide height − top margin − bottom margin)
         slide_h     = prs.slide_height           # in EMU units
@@ -113,5 +124,22 @@ def build_deck(df, chart_paths, out_dir="report_exports"):
            .text_frame.text = "(Chart image unavailable)"
 
     # Always save the presentation, even if chart is missing
-    prs.save(out_path)
-    return out_path
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
+
+
+def content_hash(df, chart_images) -> str:
+    """Digest of everything a deck is built from: metrics frame + chart images."""
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    h.update(",".join(df.columns).encode())
+    for name, png in sorted(chart_images.items()):
+        h.update(name.encode())
+        h.update(png or b"")
+    return h.hexdigest()
+
+
+def build_deck_cached(df, chart_images) -> bytes:
+    """build_deck(), skipped when an identical deck was already built."""
+    key = content_hash(df, chart_images)
+    return _decks.get("deck", key, lambda: build_deck(df, chart_images))
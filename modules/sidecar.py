@@ -0,0 +1,106 @@
+# modules/sidecar.py
+# ---------------------------------------------------------------------
+# Persisted compute() results, one columnar file per profile:
+#
+#   DATA_DIR/<profile>.metrics.parquet
+#
+# The file's metadata records metrics.ENGINE_VERSION and the source
+# log's version token.  When both still match, the metrics are read back
+# (only the rows from `start` on) instead of recomputed, so the first
+# session after a restart is as fast as a warm one.  When only the log
+# changed, the rows that differ are spliced in with compute_incremental;
+# a new engine version or deleted entries trigger a full compute.
+#
+# Enabled with METRICS_SIDECAR=1 (needs pyarrow).
+# ---------------------------------------------------------------------
+from pathlib import Path
+import importlib.util
+import json
+import os
+import pandas as pd
+
+from modules import metrics
+from modules.backends import COLUMNS, Backend, _atomic_write, _typed
+
+ENABLED = (os.getenv("METRICS_SIDECAR", "") == "1"
+           and importlib.util.find_spec("pyarrow") is not None)
+
+_ENGINE = b"metrics_engine"
+_SOURCE = b"source_version"
+
+
+def path(backend: Backend, profile: str) -> Path:
+    """Sidecar that sits next to `profile`'s log."""
+    return backend.location(profile).parent / f"{profile}.metrics.parquet"
+
+
+def fingerprint(backend: Backend, profile: str) -> str:
+    """The source log's version token, as stored in the sidecar."""
+    return json.dumps(backend.version(profile))
+
+
+def _meta(file: Path) -> dict:
+    import pyarrow.parquet as pq
+    try:
+        return pq.read_schema(file).metadata or {}
+    except (FileNotFoundError, OSError):
+        return {}
+
+
+def _write(file: Path, out: pd.DataFrame, source: str):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        _ENGINE: str(metrics.ENGINE_VERSION).encode(),
+        _SOURCE: source.encode(),
+    })
+    _atomic_write(file, lambda tmp: pq.write_table(table, tmp, row_group_size=1024))
+
+
+def _changed(prev: pd.DataFrame, raw: pd.DataFrame):
+    """Dates whose entry is new or edited since `prev`; None if any were deleted."""
+    if not prev["date"].isin(raw["date"]).all():
+        return None
+    m = raw[COLUMNS].merge(prev[COLUMNS], on="date", how="left",
+                           suffixes=("", "_old"), indicator=True)
+    differs = m["_merge"].eq("left_only")
+    for col in ("juice", "anxiety"):
+        differs |= m[col].astype("float64").ne(m[f"{col}_old"].astype("float64"))
+    differs |= m["event"].fillna("").astype(str).ne(m["event_old"].fillna("").astype(str))
+    return m.loc[differs.to_numpy(), "date"]
+
+
+def _rebuild(backend: Backend, profile: str, file: Path, meta: dict) -> pd.DataFrame:
+    """Full-history metrics, incrementally from the old sidecar when possible."""
+    source = fingerprint(backend, profile)
+    raw = backend.load(profile)
+    out = None
+    if meta.get(_ENGINE) == str(metrics.ENGINE_VERSION).encode():
+        prev = _typed(pd.read_parquet(file))
+        changed = _changed(prev, raw)
+        if changed is not None:
+            out = metrics.compute_incremental(prev, raw, changed)
+    if out is None:
+        out = metrics.compute(raw)
+    _write(file, out, source)
+    return out
+
+
+def load(backend: Backend, profile: str, start=None) -> pd.DataFrame:
+    """
+    metrics.compute() of `profile`'s whole log, limited to date >= start,
+    served from the sidecar (refreshed first if it is stale).
+    """
+    file = path(backend, profile)
+    meta = _meta(file)
+    fresh = (meta.get(_ENGINE) == str(metrics.ENGINE_VERSION).encode()
+             and meta.get(_SOURCE) == fingerprint(backend, profile).encode())
+    if fresh:
+        filters = None if start is None else [("date", ">=", pd.Timestamp(start))]
+        return _typed(pd.read_parquet(file, filters=filters).reset_index(drop=True))
+    out = _rebuild(backend, profile, file, meta)
+    if start is not None:
+        out = out[out["date"] >= pd.Timestamp(start)].reset_index(drop=True)
+    return out
@@ -2,46 +2,137 @@
 from pathlib import Path
 import os, pandas as pd, streamlit as st
 
-DATA_DIR  = Path(os.getenv("DATA_DIR", "data"))
-DATA_DIR.mkdir(exist_ok=True)
+from modules import cache
+from modules.backends import Backend, check_columns, open_backend
+from modules.backends.csv_store import CsvBackend
+
+DATA_DIR  = Path(os.getenv("DATA_DIR", "data"))     # created on first write
 
 DEMO_FILE = DATA_DIR / "demo.csv"
-_COLUMNS  = ["date", "juice", "anxiety", "event"]
+
+# "csv" (one file per nickname), "sqlite" (one indexed database) or
+# "parquet" (one columnar file per nickname)
+BACKEND   = os.getenv("STORAGE_BACKEND", "csv")
+
+_store = open_backend(BACKEND, DATA_DIR)
+_demo  = CsvBackend(DATA_DIR)           # demo data always ships as a CSV
 
 # ------------------------------------------------------------------
 def _uid() -> str | None:
     return st.session_state.get("nickname")
 
+def backend_for(profile: str | None = None) -> tuple[Backend, str]:
+    """Backend + profile key for `profile` (default: the current session's)."""
+    uid = _uid() if profile is None else profile
+    return demo_backend() if uid is None else (_store, uid)
+
+def demo_backend() -> tuple[Backend, str]:
+    """Backend + profile key of the read-only demo log."""
+    return _demo, DEMO_FILE.stem
+
 def _path() -> Path:
-    """Active CSV path."""
-    return DEMO_FILE if _uid() is None else DATA_DIR / f"{_uid()}.csv"
+    return data_file()
+
+def data_file(profile: str | None = None) -> Path:
+    """Data file for a profile (default: active) — its CSV or the shared SQLite database."""
+    backend, profile = backend_for(profile)
+    return backend.location(profile)
+
+def data_version(profile: str | None = None):
+    """(tag, token) for a profile (default: active); token changes on every write."""
+    backend, profile = backend_for(profile)
+    return (str(backend.location(profile)), profile), backend.version(profile)
 
-def _ensure():
-    """If active CSV is missing, create blank file with headers."""
-    p = _path()
-    if not p.exists():
-        pd.DataFrame(columns=_COLUMNS).to_csv(p, index=False)
+def profiles() -> list[str]:
+    """Nicknames with data in the configured backend (the demo excluded)."""
+    return [p for p in _store.profiles() if _store.location(p) != DEMO_FILE]
 
 # ------------------------------------------------------------------
-def load_log() -> pd.DataFrame:
-    _ensure()
-    return pd.read_csv(_path(), parse_dates=["date"])
+def load_log(start=None, end=None, columns=None, lookback: int = 0) -> pd.DataFrame:
+    """
+    Active profile's log, optionally limited to start <= date <= end.
+
+    `lookback` adds that many entries just before `start` so rolling
+    metrics (see metrics.LOOKBACK) are exact from the first shown row;
+    `columns` limits which value columns are read ("date" is always kept).
+    """
+    backend, profile = backend_for()
+    key = ("load", start, end, None if columns is None else tuple(columns), lookback)
+    return cache.memo(data_version(), key,
+                      lambda: backend.load(profile, start, end, columns, lookback))
+
+def date_span() -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
+    """(first, last) logged date for the active profile."""
+    backend, profile = backend_for()
+    return cache.memo(data_version(), ("span",), lambda: backend.span(profile))
 
 def upsert_entry(day, juice: int, anxiety: int, event: str = ""):
-    _ensure()
-    path = _path()
-    df = pd.read_csv(path, parse_dates=["date"])
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    day_ts     = pd.Timestamp(day)
-    mask       = df["date"].dt.date == day_ts.date()
-
-    if mask.any():
-        df.loc[mask, ["juice", "anxiety", "event"]] = [juice, anxiety, event]
-    else:
-        df = pd.concat(
-            [df, pd.DataFrame([{
-                "date": day_ts, "juice": juice, "anxiety": anxiety, "event": event
-            }])], ignore_index=True)
-
-    df.sort_values("date").to_csv(path, index=False)
+    backend, profile = backend_for()
+    backend.upsert(profile, day, juice, anxiety, event)
+    cache.invalidate(data_version()[0])
+
+def bulk_upsert(frame: pd.DataFrame, profile: str | None = None):
+    """
+    Merge many (date, juice, anxiety[, event]) rows in one pass; the last
+    row per date wins, also over entries already stored.
+    """
+    backend, profile = backend_for(profile)
+    backend.bulk_upsert(profile, frame)
+    cache.invalidate(data_version(profile)[0])
+
+def read_batches(path, chunksize: int = 100_000):
+    """Stream a .csv or .jsonl file as DataFrame chunks."""
+    path = Path(path)
+    if path.suffix in (".jsonl", ".ndjson"):
+        return pd.read_json(path, lines=True, chunksize=chunksize, convert_dates=False)
+    return pd.read_csv(path, chunksize=chunksize)
+
+def import_file(path, profile: str | None = None, chunksize: int = 100_000) -> int:
+    """
+    bulk_upsert() a file of any size.  Chunks are reduced to the last row
+    per date as they stream in, so memory is bounded by the number of
+    distinct days rather than by the input.  Returns rows merged.
+    """
+    merged = None
+    for chunk in read_batches(path, chunksize):
+        check_columns(chunk)
+        chunk = chunk.assign(date=pd.to_datetime(chunk["date"]).dt.normalize())
+        merged = chunk if merged is None else pd.concat([merged, chunk], ignore_index=True)
+        merged = merged.drop_duplicates("date", keep="last")
+    if merged is None or merged.empty:
+        return 0
+    bulk_upsert(merged, profile)
+    return len(merged)
+
+def compact():
+    """Run backend housekeeping (e.g. fold the CSV journal) for the active profile."""
+    backend, profile = backend_for()
+    backend.compact(profile)
+
+def convert(kind: str = "parquet", profiles=None, force: bool = False) -> dict[str, int | None]:
+    """
+    One-shot copy of the CSV profiles under DATA_DIR (default: all but
+    the demo) into the `kind` backend.  Each CSV journal is folded first;
+    the CSV files are left in place.  Profiles the target already holds
+    are skipped (None) unless `force`, since the CSV copy may be stale.
+    Returns rows copied per profile.
+    """
+    source = CsvBackend(DATA_DIR)
+    target = open_backend(kind, DATA_DIR)
+    if profiles is None:
+        profiles = [p for p in source.profiles() if p != DEMO_FILE.stem]
+    existing = set(target.profiles())
+    copied = {}
+    for profile in profiles:
+        if not source.location(profile).exists():
+            raise FileNotFoundError(source.location(profile))
+        if profile in existing and not force:
+            copied[profile] = None
+            continue
+        source.compact(profile)
+        df = source.load(profile)
+        if not df.empty:
+            target.bulk_upsert(profile, df)
+            cache.invalidate((str(target.location(profile)), profile))
+        copied[profile] = len(df)
+    return copied
@@ -1,4 +1,12 @@
-from . import sidebar
-from . import kpi
-from . import charts
-from . import heatmap
\ No newline at end of file
+# modules/ui/__init__.py
+# Submodules load on first attribute access (PEP 562), so importing one
+# UI piece does not drag in the others and their dependencies.
+import importlib
+
+__all__ = ["sidebar", "kpi", "charts", "heatmap"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,6 @@
+# modules/ui/_compat.py
+import streamlit as st
+
+# Partial reruns: the decorated function re-executes on its own when one of
+# its widgets changes.  Named st.experimental_fragment before Streamlit 1.37.
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
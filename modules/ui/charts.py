@@ -1,14 +1,13 @@
 # modules/ui/charts.py  – modular version
+import os
 import altair as alt
+import numpy as np
 import streamlit as st
-from pathlib import Path
 import pandas as pd
 
+from modules import render
 from modules.palette import PAL_BLUE, PAL_ORANGE, PAL_TEAL, PAL_GREEN, PAL_RED
 
-EXPORT_DIR = Path("export_charts")
-EXPORT_DIR.mkdir(exist_ok=True)
-
 
 # ── internal helpers ───────────────────────────────────────────────────────
 def _base(df: pd.DataFrame) -> alt.Chart:
@@ -16,31 +15,93 @@ def _base(df: pd.DataFrame) -> alt.Chart:
     return alt.Chart(df).encode(x="date:T")
 
 
-def _export_png(chart: alt.Chart, filename: str) -> Path | None:
-    """Save chart as PNG; return path or None if export fails."""
-    path = EXPORT_DIR / filename
+def _export_png(chart: alt.Chart, name: str) -> bytes | None:
+    """Render chart to PNG bytes (cached per spec); None if export fails."""
     try:
-        import altair_saver  # backend auto‑registered
-        chart.save(path, scale_factor=2)
-        return path
+        return render.to_png(chart, scale=2)
     except Exception as e:
-        st.warning(f"Could not export {filename}: {e}")
+        st.warning(f"Could not export {name}: {e}")
         return None
 
 
+# Above this many rows per series, lines are downsampled (LTTB) and the
+# dGQ/dt bars aggregated by week / month, so the Vega-Lite payload stays
+# small however long the history gets.
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "500"))
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of `n` points that keep the visual shape of (x, y) —
+    Largest-Triangle-Three-Buckets.  First and last points are always kept.
+    """
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+    edges = np.linspace(1, size - 1, n - 1).astype(int)   # n-2 inner buckets
+    keep = np.empty(n, dtype=int)
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 3 < n else size)
+        cx, cy = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def _points(df: pd.DataFrame, cols: list[str], max_points: int | None = None) -> pd.DataFrame:
+    """
+    Just "date" + `cols`, rounded for a compact JSON payload, and
+    LTTB-downsampled per column once there are more than max_points rows.
+    """
+    max_points = CHART_MAX_POINTS if max_points is None else max_points
+    out = df[["date", *cols]].reset_index(drop=True)
+    num = [c for c in cols if pd.api.types.is_numeric_dtype(out[c])]
+    out[num] = out[num].astype("float64").round(4)     # float32 noise → short numbers
+    if len(out) <= max_points:
+        return out
+    x = out["date"].to_numpy(dtype="datetime64[ns]").astype("int64") / 86_400e9
+    keep = set()
+    for c in num:
+        valid = np.flatnonzero(out[c].notna().to_numpy())
+        keep.update(valid[_lttb(x[valid], out[c].to_numpy()[valid], max_points)])
+    return out.iloc[sorted(keep)].reset_index(drop=True)
+
+
+def _bars(df: pd.DataFrame, cols: list[str], max_points: int | None = None
+          ) -> tuple[pd.DataFrame, str]:
+    """
+    Daily rows, or their weekly / monthly means once there are more than
+    max_points of them.  Returns (frame, period label).
+    """
+    max_points = CHART_MAX_POINTS if max_points is None else max_points
+    out, period = _points(df, cols, max_points=len(df)), "day"
+    for freq, label in (("W", "week"), ("MS", "month")):
+        if len(out) <= max_points:
+            break
+        out = (df.set_index("date")[cols].astype("float64")
+                 .resample(freq).mean().round(4).dropna(how="all").reset_index())
+        period = label
+    return out, period
+
+
 # ── Juice & Anxiety (+ optional events) ────────────────────────────────────
 import pandas as pd
 import altair as alt
 from modules.palette import PAL_BLUE, PAL_ORANGE
 
 # -------------------------------------------------------------------------
-def juice_anxiety_chart(df: pd.DataFrame) -> tuple[alt.Chart, Path | None]:
+def juice_anxiety_chart(df: pd.DataFrame,
+                        export: bool = True) -> tuple[alt.Chart, bytes | None]:
     """
     Build Juice–Anxiety line/point chart with a proper legend.
-    Returns (Altair chart, PNG path or None).
+    Returns (Altair chart, PNG bytes or None); export=False skips the PNG.
     """
     # ---- reshape to long form so Altair can auto‑legend ------------------
-    df_long = df.melt(
+    df_long = _points(df, ["juice", "anxiety"]).melt(
         id_vars=["date"],
         value_vars=["juice", "anxiety"],
         var_name="metric",
@@ -88,7 +149,8 @@ def juice_anxiety_chart(df: pd.DataFrame) -> tuple[alt.Chart, Path | None]:
                and df["event"].fillna("").str.strip().ne("").any())
 
     if has_evt:
-        evt_df = df[df["event"].fillna("").str.strip() != ""]
+        evt_df = _points(df[df["event"].fillna("").str.strip() != ""], ["juice", "event"],
+                         max_points=len(df))
         annot = (
             alt.Chart(evt_df)
             .mark_text(align="left", dx=5, dy=-5, color="#666", fontSize=11)
@@ -111,17 +173,18 @@ def juice_anxiety_chart(df: pd.DataFrame) -> tuple[alt.Chart, Path | None]:
     )
 
     # ---- export PNG for board deck ---------------------------------------
-    png_path = _export_png(chart, "juice_anxiety.png")
-    return chart, png_path
+    png = _export_png(chart, "juice_anxiety.png") if export else None
+    return chart, png
 
 
 
 # ── GQ trend line ──────────────────────────────────────────────────────────
 def gq_chart(df: pd.DataFrame) -> alt.Chart:
     """Build GQ line chart with healthy threshold line."""
+    pts = _points(df, ["gq"])
     # Main GQ line chart - single connected line with conditional point colors
     gq_line = (
-        alt.Chart(df)
+        alt.Chart(pts)
         .mark_line(strokeWidth=2, color='#666')  # Neutral line color
         .encode(
             x="date:T",
@@ -132,7 +195,7 @@ def gq_chart(df: pd.DataFrame) -> alt.Chart:
     
     # Add colored points on top
     gq_points = (
-        alt.Chart(df)
+        alt.Chart(pts)
         .mark_circle(size=80, stroke='white', strokeWidth=1)
         .encode(
             x="date:T",
@@ -194,8 +257,9 @@ def gq_chart(df: pd.DataFrame) -> alt.Chart:
 # ── dGQ/dt bars + 7‑day trend ─────────────────────────────────────────────
 def dgqdt_chart(df: pd.DataFrame) -> alt.Chart:
     """Bar chart for dGQ/dt with 7-day moving average trend line."""
+    daily, period = _bars(df, ["dgqdt"])
     bars = (
-        alt.Chart(df)
+        alt.Chart(daily)
         .mark_bar(size=8)
         .encode(
             x="date:T",
@@ -207,7 +271,7 @@ def dgqdt_chart(df: pd.DataFrame) -> alt.Chart:
         )
     )
     trend = (
-        alt.Chart(df)
+        alt.Chart(_points(df, ["dgqdt_7d"]))
         .mark_line(color="#222", strokeDash=[4, 2])
         .encode(
             x="date:T",
@@ -220,7 +284,9 @@ def dgqdt_chart(df: pd.DataFrame) -> alt.Chart:
         .properties(
             title=alt.TitleParams(
                 text="Daily & 7-day change in GQ", 
-                subtitle="Bars = daily change • Dashed line = 7-day moving average trend",
+                subtitle=("Bars = daily change" if period == "day"
+                          else f"Bars = mean daily change per {period}")
+                         + " • Dashed line = 7-day moving average trend",
                 anchor="middle", 
                 fontSize=16, 
                 fontWeight="bold", 
@@ -234,17 +300,31 @@ def dgqdt_chart(df: pd.DataFrame) -> alt.Chart:
 
 
 # ── public entrypoint for app.py ───────────────────────────────────────────
-def draw(df: pd.DataFrame) -> Path | None:
-    """Render all charts to Streamlit; return PNG path for board‑deck."""
+def build(df: pd.DataFrame) -> dict:
+    """Vega-Lite specs of the charts draw() shows (no PNG rendering)."""
     # ① Juice / Anxiety
-    juice_chart, png_path = juice_anxiety_chart(df)
-    st.altair_chart(juice_chart, use_container_width=True)
+    juice_chart, _ = juice_anxiety_chart(df, export=False)
+    specs = {"juice_anx": juice_chart.to_dict()}
 
     # ② GQ
-    st.altair_chart(gq_chart(df), use_container_width=True)
+    specs["gq"] = gq_chart(df).to_dict()
 
     # ③ derivative
     if len(df) > 1 and df["dgqdt"].abs().sum() > 0:
-        st.altair_chart(dgqdt_chart(df), use_container_width=True)
+        specs["dgqdt"] = dgqdt_chart(df).to_dict()
+    return specs
 
-    return png_path
+
+def deck_png(df: pd.DataFrame) -> bytes | None:
+    """Juice/Anxiety PNG for the board deck; only rendered when a deck is built."""
+    chart, _ = juice_anxiety_chart(df, export=False)
+    return _export_png(chart, "juice_anxiety.png")
+
+
+def draw(df: pd.DataFrame, specs: dict | None = None):
+    """
+    Render all charts to Streamlit.
+    `specs` is a ready build(df) result (e.g. the shared demo bundle).
+    """
+    for spec in (specs or build(df)).values():
+        st.vega_lite_chart(spec, use_container_width=True)
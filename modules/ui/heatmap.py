@@ -3,23 +3,68 @@ import altair as alt
 import streamlit as st
 import pandas as pd
 import numpy as np
+from modules.cache import memo
+from modules.metrics import compute, lookback
 from modules.palette import PAL_TEAL, PAL_ORANGE
+from modules.storage import data_version, date_span, load_log
 import os
 
-def draw(df: pd.DataFrame, title: str = "Surplus Drive Heat-map (↔ = Weeks; ↕ = Days of week)"):
-    """Render a calendar-style heat‑map of Surplus Drive (sd)."""
-    if df.empty or "sd" not in df.columns:
-        st.info("Not enough data for heat‑map.")
-        return
+RANGES = {"Last 90 days": 90, "Last year": 365, "Last 3 years": 3 * 365, "All time": None}
+
+
+def matrix(df: pd.DataFrame, value: str = "sd") -> tuple[np.ndarray, pd.DatetimeIndex]:
+    """
+    Dense (weeks × 7) grid of `value` (NaN = no entry) plus the Monday
+    each row starts on.  Weeks are keyed by their Monday rather than the
+    ISO week number, so they stay in order across year boundaries.
+    """
+    if df.empty:
+        return np.empty((0, 7), dtype="float32"), pd.DatetimeIndex([])
+    days = df["date"].to_numpy(dtype="datetime64[D]")
+    dow = (days.astype("int64") + 3) % 7               # 1970-01-01 was a Thursday; Mon = 0
+    monday = days - dow
+    first = monday.min()
+    week = (monday - first).astype("int64") // 7
+    grid = np.full((int(week.max()) + 1, 7), np.nan, dtype="float32")
+    grid[week, dow] = df[value].to_numpy(dtype="float32")
+    return grid, pd.date_range(first, periods=len(grid), freq="7D")
+
+
+def _cells(grid: np.ndarray, weeks: pd.DatetimeIndex) -> pd.DataFrame:
+    """Filled cells of a matrix() grid as the small long frame Altair draws."""
+    w, d = np.nonzero(~np.isnan(grid))
+    start = weeks[w]
+    return pd.DataFrame({
+        "week": start,
+        "week_end": start + pd.Timedelta(days=7),
+        "dow": d,
+        "date": start + pd.to_timedelta(d, unit="D"),
+        "sd": grid[w, d].astype("float64").round(2),
+    })
 
-    # last 90 calendar days
-    cutoff = df["date"].max() - pd.Timedelta(days=89)
-    df_hm = df[df["date"] >= cutoff].copy()
 
-    # calendar fields
-    df_hm["dow"]  = df_hm["date"].dt.weekday            # 0 = Mon
-    df_hm["week"] = df_hm["date"].dt.isocalendar().week
+def _grid(start) -> tuple[np.ndarray, pd.DatetimeIndex]:
+    """matrix() of Surplus Drive from `start` on, memoized per data version."""
+    def build():
+        raw = load_log(start=start, columns=["juice", "anxiety"], lookback=lookback(["sd"]))
+        return matrix(compute(raw, metrics=["sd"]))
+    return memo(data_version(), ("heatmap", start), build)
+
+
+def draw(title: str = "Surplus Drive Heat-map (↔ = Weeks; ↕ = Days of week)"):
+    """Render a calendar-style heat‑map of Surplus Drive (sd)."""
+    choice = st.radio("Heat-map range", list(RANGES), horizontal=True, key="heatmap_range")
+    _, last = date_span()
+    start = None
+    if RANGES[choice] is not None and last is not None:
+        start = last - pd.Timedelta(days=RANGES[choice] - 1)
+
+    grid, weeks = _grid(start)
+    if not np.isfinite(grid).any():
+        st.info("Not enough data for heat‑map.")
+        return
 
+    df_hm = _cells(grid, weeks)
     max_abs = float(np.abs(df_hm["sd"]).max()) or 1
     colour_scale = alt.Scale(domain=[-max_abs, 0, max_abs],
                              range=[PAL_ORANGE, "#f0f0f0", PAL_TEAL])
@@ -39,13 +84,16 @@ def draw(df: pd.DataFrame, title: str = "Surplus Drive Heat-map (↔ = Weeks; 
         alt.Chart(df_hm)
         .mark_rect()
         .encode(
-            x=alt.X("week:O",
+            # weeks on a time axis: one column per Monday, labelled by
+            # month, however many years are shown
+            x=alt.X("week:T",
                     title="Week",
                     axis=alt.Axis(
-                        labelExpr="'W' + datum.label",
+                        format="%b %Y" if len(weeks) > 26 else "%d %b",
                         labelAngle=0,
                         labelFontSize=12
                     )),
+            x2="week_end:T",
             y=alt.Y("dow:O",
                     sort=list(range(7)),
                     title="Day",
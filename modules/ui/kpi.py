@@ -6,7 +6,8 @@ from modules.palette import (
 )
 import pandas as pd
 
-def draw(df, selected_row):
+def draw(selected_row):
+    """KPI tiles for one row of metrics.compute(); deltas come precomputed."""
     # Add explanation subtitle for the arrows/deltas
     selected_date = selected_row.date.strftime('%Y-%m-%d')
     st.markdown(
@@ -22,12 +23,11 @@ def draw(df, selected_row):
     
     k1, k2, k3 = st.columns(3)
 
-    # Find the index of the selected row to calculate deltas
-    selected_idx = df[df['date'] == selected_row.date].index[0]
+    # days counts from the first entry, so 0 means there is no previous day
+    first_entry = selected_row.days == 0
     
     # ── 1) GQ ───────────────────────────────────────────────────────────────
-    prev_gq = df.gq.iloc[selected_idx-1] if selected_idx > 0 else selected_row.gq
-    delta_gq = selected_row.gq - prev_gq if selected_idx > 0 else None
+    delta_gq = None if first_entry else selected_row.gq_delta
     k1.metric(
         label="GQ (Gumption Quotient)",
         value=f"{selected_row.gq:0.2f}",
@@ -37,11 +37,10 @@ def draw(df, selected_row):
     )
 
     # --- Φf  (Focus Flux) ------------------------------------------------------
-    prev_flux = df.focus_flux.iloc[selected_idx-1] if selected_idx > 0 else selected_row.focus_flux
-    delta_flux = selected_row.focus_flux - prev_flux if selected_idx > 0 else None
+    delta_flux = None if first_entry else selected_row.focus_flux_delta
     
     # Use neutral color for insufficient data
-    arrow_col = "#999" if selected_idx == 0 else PAL_TEAL
+    arrow_col = "#999" if first_entry else PAL_TEAL
     arrow = "↑" if selected_row.focus_flux > 0 else "↓" if selected_row.focus_flux < 0 else ""
 
     k2.metric(
@@ -63,7 +62,7 @@ def draw(df, selected_row):
         PAL_RED
     )
     # Use neutral color for insufficient data
-    if len(df) < 2:
+    if first_entry:
         sigma_colour = "#999"
     entropy_html = f"""
     <div title="Rolling 4-day standard deviation of Juice. Measures volatility (green < 1.5, yellow 1.5-2.5, red > 2.5)"
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import date
-from modules.storage import upsert_entry, DATA_DIR, DEMO_FILE
+from modules.storage import load_log, upsert_entry, DATA_DIR, DEMO_FILE
 import shutil
 import os
 
@@ -23,27 +23,32 @@ def _nickname_prompt():
             st.rerun()
 
 
-def draw(df_raw):
+def draw():
     _nickname_prompt()
     st.sidebar.header("Log / Edit Entry  📅")
 
     # --- choose date -------------------------------------------------------
     sel_date = st.sidebar.date_input("Select date", value=date.today())
 
-    # pre‑fill sliders if date already logged
-    if not df_raw.empty and sel_date in df_raw["date"].dt.date.values:
-        row = df_raw[df_raw["date"].dt.date == sel_date].iloc[0]
+    # pre‑fill sliders if date already logged (point read, not the whole log)
+    logged = load_log(start=sel_date, end=sel_date)
+    if not logged.empty:
+        row = logged.iloc[0]
         default_juice = int(row.juice)
         default_anx   = int(row.anxiety)
         default_event = "" if pd.isna(row.event) else str(row.event)
     else:
         default_juice, default_anx, default_event = 5, 5, ""
 
-    juice   = st.sidebar.slider("Juice (0-10)", 0, 10, value=default_juice)
-    anxiety = st.sidebar.slider("Anxiety (0-10)", 0, 10, value=default_anx)
-    event   = st.sidebar.text_input("Event note (optional)", value=default_event)
+    # the entry widgets only send their values on submit, so dragging a
+    # slider or typing a note does not rerun the whole app
+    with st.sidebar.form("entry"):
+        juice   = st.slider("Juice (0-10)", 0, 10, value=default_juice)
+        anxiety = st.slider("Anxiety (0-10)", 0, 10, value=default_anx)
+        event   = st.text_input("Event note (optional)", value=default_event)
+        submitted = st.form_submit_button("Save / Update")
 
-    if st.sidebar.button("Save / Update"):
+    if submitted:
         # Save to the correct file based on nickname
         if "nickname" in st.session_state:
             user_file = DATA_DIR / f"{st.session_state['nickname']}.csv"
@@ -0,0 +1,71 @@
+# tests/test_app.py
+# Partial reruns: the KPI, charts and heat-map sections must be fragments
+# (so their own widgets rerun only them) and the entry widgets must sit in
+# a form (so they send nothing until it is submitted).  Checked through
+# the public AppTest API and a spy on _compat.fragment, not Streamlit's
+# fragment runtime, which changes between releases.
+from pathlib import Path
+import importlib, modules.storage
+import sys
+import pandas as pd
+import pytest
+
+import streamlit.components.v1       # app.py uses st.components; `streamlit run` preloads it
+from streamlit.testing.v1 import AppTest
+from modules.ui import _compat, charts, heatmap, kpi
+
+APP = str(Path(__file__).resolve().parents[1] / "app.py")
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    storage = importlib.reload(modules.storage)
+    pd.DataFrame({"date": pd.date_range("2025-01-01", periods=60),
+                  "juice": 6, "anxiety": 3, "event": ""})\
+      .to_csv(storage.DEMO_FILE, index=False, date_format="%Y-%m-%d")
+    # the script runner installs app.py as __main__; put ours back afterwards
+    # (spawned worker processes re-import __main__)
+    monkeypatch.setitem(sys.modules, "__main__", sys.modules["__main__"])
+    yield AppTest.from_file(APP, default_timeout=60)
+    monkeypatch.undo()
+    importlib.reload(modules.storage)              # back to the real DATA_DIR
+
+
+def test_sections_are_fragments(app, monkeypatch):
+    inside, drawn = [], []                          # fragment being run / (section, fragment)
+    real = _compat.fragment
+
+    def spy(func):
+        def section(*a, **k):
+            inside.append(func.__name__)
+            try:
+                return func(*a, **k)
+            finally:
+                inside.pop()
+        section.__name__ = func.__name__
+        return real(section)
+
+    monkeypatch.setattr(_compat, "fragment", spy)
+    for mod in (kpi, charts, heatmap):
+        draw = mod.draw
+        monkeypatch.setattr(mod, "draw", lambda *a, _m=mod.__name__, _f=draw, **k:
+                            drawn.append((_m.rsplit(".", 1)[1], inside[-1] if inside else None))
+                            or _f(*a, **k))
+    app.run()
+    assert not app.exception
+    assert sorted(drawn) == [("charts", "_charts_section"), ("heatmap", "_heatmap_section"),
+                             ("kpi", "_kpi_section")]
+
+
+def test_entry_sliders_wait_for_the_form_submit(app):
+    app.session_state["nickname"] = "pia"
+    app.run()
+    entry = [s for s in app.slider if s.label in ("Juice (0-10)", "Anxiety (0-10)")]
+    assert len(entry) == 2 and all(s.form_id == "entry" for s in entry)
+
+    entry[0].set_value(9).run()                     # not submitted: nothing saved
+    assert not modules.storage.data_file("pia").exists()
+
+    app.button[[b.label for b in app.button].index("Save / Update")].click().run()
+    assert modules.storage.CsvBackend(modules.storage.DATA_DIR).load("pia")["juice"].tolist() == [9]
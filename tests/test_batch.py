@@ -0,0 +1,29 @@
+# tests/test_batch.py
+from pathlib import Path
+import tempfile
+import importlib, modules.storage
+import pandas as pd
+import streamlit as st
+
+from modules import batch
+
+
+def test_build_all_writes_decks_and_skips_unchanged(monkeypatch):
+    tmp = Path(tempfile.mkdtemp())
+    monkeypatch.setenv("DATA_DIR", str(tmp / "data"))
+    monkeypatch.setattr(st, "session_state", {}, raising=False)
+    storage = importlib.reload(modules.storage)
+    for name in ("ann", "ben"):
+        storage.bulk_upsert(pd.DataFrame({"date": pd.date_range("2025-01-01", periods=40),
+                                          "juice": 6, "anxiety": 3}), profile=name)
+
+    out = tmp / "decks"
+    first = batch.build_all(out_dir=out, workers=2)
+    assert [(r.profile, r.status) for r in first] == [("ann", "built"), ("ben", "built")]
+    assert Path(first[0].path).read_bytes()[:2] == b"PK"        # pptx is a zip
+
+    storage.upsert_entry(pd.Timestamp("2025-02-15"), 9, 1, "")   # demo, not a profile
+    storage.bulk_upsert(pd.DataFrame({"date": ["2025-02-10"], "juice": [9], "anxiety": [1]}),
+                        profile="ben")
+    again = batch.build_all(out_dir=out, workers=2)
+    assert [r.status for r in again] == ["unchanged", "built"]
@@ -0,0 +1,14 @@
+from benchmarks import run as bench
+
+
+def test_bench_runs_at_small_size():
+    results, memory = bench.run(sizes=[10], repeat=1, only=["compute", "csv"])
+    assert set(results) == {"load_log[csv]@10", "upsert_entry[csv]@10", "metrics.compute@10"}
+    assert all(t >= 0 for t in results.values())
+    assert set(memory) == {"load_log[csv]@10", "metrics.compute@10"}   # frame-returning cases
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    baseline = {"a@10": 1.0, "b@10": 1.0}
+    results  = {"a@10": 1.2, "b@10": 1.3, "c@10": 9.0}   # c has no baseline
+    assert bench.compare(results, baseline, threshold=0.25) == ["b@10"]
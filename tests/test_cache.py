@@ -0,0 +1,25 @@
+from modules.cache import LRU
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRU(maxsize=2)
+    lru.get("a", 1, lambda: "a1")
+    lru.get("b", 1, lambda: "b1")
+    lru.get("a", 1, lambda: "rebuilt")      # touch "a"
+    lru.get("c", 1, lambda: "c1")           # evicts "b"
+
+    assert len(lru) == 2
+    assert lru.get("a", 1, lambda: "rebuilt") == "a1"
+    assert lru.get("b", 1, lambda: "b2") == "b2"
+
+
+def test_invalidate_drops_every_entry_for_a_tag():
+    lru = LRU(maxsize=8)
+    lru.get("alice", ("v1", "load"), lambda: 1)
+    lru.get("alice", ("v1", "compute"), lambda: 2)
+    lru.get("bob", ("v1", "load"), lambda: 3)
+
+    lru.invalidate("alice")
+
+    assert len(lru) == 1
+    assert lru.get("alice", ("v1", "load"), lambda: 10) == 10
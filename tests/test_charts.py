@@ -1,7 +1,7 @@
 from modules.ui import charts
 import pandas as pd
 import pytest
-def test_png_export(tmp_path):
+def test_png_export():
     df = pd.DataFrame({
         "date": ["2025-05-19"],
         "juice": [5],
@@ -9,11 +9,60 @@ def test_png_export(tmp_path):
     })
     df["date"] = pd.to_datetime(df["date"])
 
-    charts.EXPORT_DIR = tmp_path
     _, png = charts.juice_anxiety_chart(df)
 
     # Skip assertion if PNG export unavailable on CI runner
     if png is None:
         pytest.skip("PNG backend not available in CI container")
-    assert png.exists() and png.stat().st_size > 0
+    assert png.startswith(b"\x89PNG")
 
+def test_png_render_is_cached_per_spec(monkeypatch):
+    from modules import render
+    vl_convert = pytest.importorskip("vl_convert")
+
+    df = pd.DataFrame({"date": pd.to_datetime(["2025-05-18", "2025-05-19"]),
+                       "juice": [6, 5], "anxiety": [3, 4]})
+    calls = []
+    monkeypatch.setattr(vl_convert, "vegalite_to_png",
+                        lambda spec, **kw: calls.append(spec) or b"\x89PNG fake")
+
+    _, png = charts.juice_anxiety_chart(df)
+    _, again = charts.juice_anxiety_chart(df.copy())
+    assert png == again == b"\x89PNG fake"
+    assert len(calls) == 1          # identical spec + data → cache hit
+
+    df.loc[1, "juice"] = 9
+    charts.juice_anxiety_chart(df)
+    assert len(calls) == 2
+
+def test_long_histories_are_pruned_and_downsampled(monkeypatch):
+    import numpy as np
+    from modules import metrics
+    monkeypatch.setattr(charts, "CHART_MAX_POINTS", 100)
+
+    n = 2000
+    juice = np.full(n, 5.0)
+    juice[1234] = 10                               # a spike LTTB must keep
+    df = metrics.compute(pd.DataFrame({"date": pd.date_range("2020-01-01", periods=n),
+                                       "juice": juice, "anxiety": 4.0, "event": ""}))
+
+    pts = charts._points(df, ["juice"])
+    assert list(pts.columns) == ["date", "juice"]
+    assert len(pts) == 100 and pts["juice"].max() == 10
+    assert pts["date"].iloc[[0, -1]].tolist() == df["date"].iloc[[0, -1]].tolist()
+
+    bars, period = charts._bars(df, ["dgqdt"])
+    assert period == "month" and len(bars) <= 100
+
+    spec = charts.gq_chart(df).to_dict()
+    rows = [r for d in spec["datasets"].values() for r in d if "gq" in r]
+    assert len(rows) <= 100 and set(rows[0]) == {"date", "gq"}
+
+def test_build_renders_no_png(monkeypatch):
+    from modules import metrics, render
+    calls = []
+    monkeypatch.setattr(render, "to_png", lambda chart, scale=2: calls.append(chart) or b"\x89PNG")
+    df = metrics.compute(pd.DataFrame({"date": pd.date_range("2025-01-01", periods=30),
+                                       "juice": 6.0, "anxiety": 3.0, "event": ""}))
+    assert "juice_anx" in charts.build(df) and calls == []
+    assert charts.deck_png(df) == b"\x89PNG" and len(calls) == 1
@@ -0,0 +1,52 @@
+# tests/test_concurrency.py
+# Many writers on one profile (threads and processes) must not lose saves.
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from modules.backends import open_backend
+
+PER_WORKER = 20
+START = pd.Timestamp("2020-01-01")
+
+
+def _hammer(kind: str, root: str, worker: int):
+    backend = open_backend(kind, Path(root))
+    for i in range(PER_WORKER):
+        day = START + pd.Timedelta(days=worker * PER_WORKER + i)
+        backend.upsert("shared", day, i % 11, worker % 11, f"w{worker}")
+
+
+def _expected(workers: int) -> list:
+    return list(pd.date_range(START, periods=workers * PER_WORKER, freq="D"))
+
+
+@pytest.mark.parametrize("kind", ["csv", "sqlite"])
+def test_threads_do_not_lose_updates(kind, tmp_path, monkeypatch):
+    monkeypatch.setenv("JOURNAL_COMPACT_AT", "7")      # compact often mid-stress
+    workers = 8
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lambda w: _hammer(kind, str(tmp_path), w), range(workers)))
+
+    df = open_backend(kind, tmp_path).load("shared")
+    assert df["date"].tolist() == _expected(workers)
+
+
+@pytest.mark.parametrize("kind", ["csv", "sqlite"])
+def test_processes_do_not_lose_updates(kind, tmp_path, monkeypatch):
+    monkeypatch.setenv("JOURNAL_COMPACT_AT", "7")
+    workers = 4
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_hammer, args=(kind, str(tmp_path), w)) for w in range(workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=120)
+        assert p.exitcode == 0
+
+    df = open_backend(kind, tmp_path).load("shared")
+    assert df["date"].tolist() == _expected(workers)
+    assert not list(tmp_path.glob("*.tmp"))          # no half-written files left
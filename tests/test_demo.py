@@ -0,0 +1,62 @@
+# tests/test_demo.py
+from pathlib import Path
+import tempfile
+import threading
+import importlib, modules.storage
+import pandas as pd
+import streamlit as st
+
+from modules import demo
+
+
+def test_demo_bundle_is_built_once_per_version(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    monkeypatch.setenv("DATA_DIR", tmp)
+    monkeypatch.setattr(st, "session_state", {}, raising=False)
+    storage = importlib.reload(modules.storage)
+    monkeypatch.setattr(demo, "_bundles", {})
+
+    dates = pd.date_range("2025-01-01", periods=60)
+    pd.DataFrame({"date": dates, "juice": 6, "anxiety": 3, "event": ""})\
+      .to_csv(storage.DEMO_FILE, index=False, date_format="%Y-%m-%d")
+
+    builds = []
+    real = demo._build
+    monkeypatch.setattr(demo, "_build", lambda days: builds.append(days) or real(days))
+
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(demo.bundle(30))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert builds == [30] and all(b is got[0] for b in got)
+    assert len(got[0].metrics) == 30 and "juice_anx" in got[0].charts
+    assert got[0].deck() is got[0].deck()
+
+    storage.upsert_entry(pd.Timestamp("2025-03-05"), 9, 1, "")    # demo file changes
+    assert demo.bundle(30) is not got[0] and builds == [30, 30]
+
+
+def test_deck_build_does_not_block_other_bundles(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    monkeypatch.setenv("DATA_DIR", tmp)
+    monkeypatch.setattr(st, "session_state", {}, raising=False)
+    storage = importlib.reload(modules.storage)
+    monkeypatch.setattr(demo, "_bundles", {})
+    pd.DataFrame({"date": pd.date_range("2025-01-01", periods=60), "juice": 6, "anxiety": 3,
+                  "event": ""}).to_csv(storage.DEMO_FILE, index=False, date_format="%Y-%m-%d")
+
+    from modules import report
+    started, release = threading.Event(), threading.Event()
+    monkeypatch.setattr(report, "build_deck",
+                        lambda *a: started.set() or release.wait(5) and b"deck")
+    slow = threading.Thread(target=demo.bundle(30).deck)
+    slow.start()
+    assert started.wait(5)
+    other = threading.Thread(target=demo.bundle, args=(None,))
+    other.start()
+    other.join(2)
+    assert not other.is_alive()                     # not stuck behind the deck
+    release.set()
+    slow.join()
@@ -0,0 +1,19 @@
+# tests/test_heatmap.py
+import numpy as np
+import pandas as pd
+
+from modules.ui import heatmap
+
+
+def test_matrix_keeps_week_order_across_year_boundary():
+    dates = pd.to_datetime(["2024-12-28", "2024-12-30", "2025-01-05", "2025-01-06"])
+    grid, weeks = heatmap.matrix(pd.DataFrame({"date": dates, "sd": [1.0, 2.0, 3.0, 4.0]}))
+
+    # Sat 28 Dec sits in ISO week 52, Mon 30 Dec already in 2025's week 1
+    assert weeks.strftime("%Y-%m-%d").tolist() == ["2024-12-23", "2024-12-30", "2025-01-06"]
+    assert grid.shape == (3, 7)
+    assert grid[0, 5] == 1 and grid[1, 0] == 2 and grid[1, 6] == 3 and grid[2, 0] == 4
+    assert np.isnan(grid).sum() == 21 - 4
+
+    cells = heatmap._cells(grid, weeks)
+    assert cells["date"].tolist() == list(dates)
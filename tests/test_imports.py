@@ -0,0 +1,58 @@
+# tests/test_imports.py
+# Cold-start guard: importing what app.py needs for first paint must stay
+# under a time budget and must not pull in export-only dependencies.
+import ast
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFERRED = ["pptx", "vl_convert", "altair_saver", "selenium"]
+
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "4000"))
+
+
+def app_modules() -> list[str]:
+    """Every module app.py imports at top level (its real cold-start set)."""
+    names = []
+    for node in ast.parse((ROOT / "app.py").read_text()).body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names.append(node.module)
+            names += [f"{node.module}.{a.name}" for a in node.names
+                      if (ROOT / node.module.replace(".", "/") / f"{a.name}.py").exists()]
+    return names
+
+
+def _importtime() -> dict[str, float]:
+    """Self time (ms) per module for a cold import of app_modules()."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(app_modules())],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us) / 1e3
+    return times
+
+
+def test_app_modules_cover_app_imports():
+    mods = app_modules()
+    for name in ("modules.demo", "modules.sidecar", "modules.ui._compat", "modules.ui.heatmap"):
+        assert name in mods
+
+
+def test_cold_import_within_budget_and_defers_heavy_deps():
+    times = _importtime()
+
+    loaded = {name.split(".")[0] for name in times}
+    assert not loaded & set(DEFERRED), f"eagerly imported: {loaded & set(DEFERRED)}"
+
+    total = sum(times.values())
+    assert total < BUDGET_MS, f"cold import took {total:.0f} ms (budget {BUDGET_MS:.0f} ms)"
@@ -6,3 +6,106 @@ def test_single_row_has_no_nans():
     df["date"] = pd.to_datetime(df["date"])
     out = compute(df)
     assert not out.isna().any().any()
+
+
+import numpy as np
+import pytest
+from modules.metrics import compute_incremental, LOOKBACK
+
+
+def _history(rng, n):
+    days = np.sort(rng.choice(3 * n, size=n, replace=False))
+    return pd.DataFrame({
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(days, unit="D"),
+        "juice": np.round(rng.uniform(0, 10, n), 1),
+        "anxiety": rng.integers(0, 11, n).astype(float),   # includes zeros
+        "event": "",
+    })
+
+
+def test_rolling_matches_pandas_semantics():
+    df = _history(np.random.default_rng(7), 120)
+    out = compute(df)
+
+    # float64 reference built with pandas' own rolling
+    gq = df["juice"] / df["anxiety"].replace(0, np.nan)
+    sd = df["juice"] - df["anxiety"]
+    days = (df["date"] - df["date"].iloc[0]).dt.total_seconds() / 86_400
+    dgqdt = gq.diff() / days.diff()
+    tol = dict(rtol=1e-6, atol=1e-6)          # derived columns are float32
+    np.testing.assert_allclose(out["fortitude"], sd.clip(lower=0).rolling(30, min_periods=1).sum(), **tol)
+    np.testing.assert_allclose(out["sigma"], df["juice"].rolling(4, min_periods=2).std().fillna(0), **tol)
+    np.testing.assert_allclose(out["dgqdt_7d"], dgqdt.rolling(7, min_periods=2).mean().fillna(0), **tol)
+    assert (out[["gq", "sd", "sigma", "fortitude"]].dtypes == "float32").all()
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_incremental_matches_full_compute_exactly(seed):
+    rng = np.random.default_rng(seed)
+    df = _history(rng, int(rng.integers(LOOKBACK + 2, 400)))
+    prev = compute(df)
+
+    # upsert a few dates: edits of existing rows and brand-new (often latest) days
+    changed = []
+    for _ in range(int(rng.integers(1, 4))):
+        if rng.random() < 0.5:
+            day = df["date"].iloc[int(rng.integers(0, len(df)))]
+        else:
+            day = df["date"].max() - pd.Timedelta(days=int(rng.integers(-5, 60)))
+        row = {"date": day, "juice": float(rng.integers(0, 11)),
+               "anxiety": float(rng.integers(0, 11)), "event": "edit"}
+        df = pd.concat([df[df["date"] != day], pd.DataFrame([row])], ignore_index=True)
+        changed.append(day)
+
+    pd.testing.assert_frame_equal(compute_incremental(prev, df, changed),
+                                  compute(df), check_exact=True)
+
+
+def test_compute_many_matches_per_profile_compute():
+    from modules.metrics import compute_many
+    rng = np.random.default_rng(7)
+    frames = {p: _history(rng, int(rng.integers(1, 120))) for p in ["b", "a", "c", "d"]}
+    long = pd.concat([f.assign(profile=p) for p, f in frames.items()], ignore_index=True)
+    got = compute_many(long.sample(frac=1, random_state=1))     # any row order
+
+    assert got["profile"].tolist() == sorted(got["profile"])
+    for p, f in frames.items():
+        part = got[got["profile"] == p].drop(columns="profile").reset_index(drop=True)
+        pd.testing.assert_frame_equal(part, compute(f), check_exact=True)
+
+
+def test_deltas_and_row_at():
+    from modules.metrics import row_at
+    df = pd.DataFrame({"date": pd.to_datetime(["2025-05-01", "2025-05-02", "2025-05-05"]),
+                       "juice": [4.0, 6.0, 3.0], "anxiety": [2.0, 2.0, 3.0]})
+    out = compute(df)
+    np.testing.assert_allclose(out["gq_delta"], [0, 1, -2])
+    np.testing.assert_allclose(out["focus_flux_delta"],
+                               out["focus_flux"].astype(float).diff().fillna(0), rtol=1e-6)
+
+    assert row_at(out, "2025-05-02").juice == 6
+    assert row_at(out, "2025-05-04").juice == 6      # no entry → last one before
+    assert row_at(out, "2025-04-01").juice == 4
+
+
+def test_registry_computes_only_requested_metrics(monkeypatch):
+    from modules import metrics
+    df = _history(np.random.default_rng(3), 80)
+    full = compute(df)
+
+    calls = []
+    for name, m in list(metrics.METRICS.items()):
+        counted = lambda c, ctx, _fn=m.fn, _n=name: calls.append(_n) or _fn(c, ctx)
+        monkeypatch.setitem(metrics.METRICS, name,
+                            metrics.Metric(name, m.inputs, m.window, counted, m.fill))
+    out = compute(df, metrics=["focus_flux"])
+
+    assert sorted(calls) == ["dJdt", "days", "focus_flux", "sd"]
+    assert list(out.columns) == list(df.columns) + ["focus_flux"]
+    pd.testing.assert_series_equal(out["focus_flux"], full["focus_flux"], check_exact=True)
+    assert metrics.lookback(["sd"]) == 0 and metrics.lookback(["dgqdt_7d"]) == 7
+    assert metrics.lookback(metrics.DERIVED) <= LOOKBACK
+    with pytest.raises(KeyError, match="typo"):
+        compute(df, metrics=["typo"])
+    with pytest.raises(KeyError, match="typo"):
+        compute(df.iloc[:0], metrics=["typo"])
@@ -0,0 +1,23 @@
+import json
+from modules import perf
+
+
+def test_rerun_record_is_written_as_json_line(tmp_path, monkeypatch):
+    log_file = tmp_path / "perf.jsonl"
+    monkeypatch.setattr(perf, "PERF_LOG", str(log_file))
+
+    perf.begin("alice")
+    with perf.span("compute"):
+        pass
+    with perf.span("compute"):      # same name accumulates
+        pass
+    with perf.span("kpi.draw"):
+        pass
+    run = perf.end(rows=42)
+
+    record = json.loads(log_file.read_text().strip())
+    assert record == run
+    assert record["profile"] == "alice" and record["rows"] == 42
+    assert set(record["spans"]) == {"compute", "kpi.draw"}
+    assert record["total_ms"] >= record["spans"]["compute"]
+    assert perf.end() is None       # record is closed
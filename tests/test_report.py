@@ -0,0 +1,34 @@
+import io
+import pandas as pd
+from pptx import Presentation
+from modules import report
+from modules.metrics import compute
+
+
+def _metrics():
+    df = pd.DataFrame({"date": pd.to_datetime(["2025-05-18", "2025-05-19"]),
+                       "juice": [6, 5], "anxiety": [3, 4]})
+    return compute(df)
+
+
+def test_build_deck_returns_pptx_bytes():
+    deck = report.build_deck(_metrics(), {"juice_anx": None})
+    assert len(Presentation(io.BytesIO(deck)).slides) == 3
+    assert report.deck_filename(_metrics()) == "Psychic_KPIs_2025-05-19.pptx"
+
+
+def test_build_deck_cached_skips_rebuild_for_same_content(monkeypatch):
+    calls = []
+    real = report.build_deck
+    monkeypatch.setattr(report, "build_deck",
+                        lambda *a, **k: calls.append(1) or real(*a, **k))
+
+    df = _metrics()
+    first = report.build_deck_cached(df, {"juice_anx": None})
+    again = report.build_deck_cached(df.copy(), {"juice_anx": None})
+    assert first == again
+    assert len(calls) == 1
+
+    df.loc[1, "juice"] = 9
+    report.build_deck_cached(df, {"juice_anx": None})
+    assert len(calls) == 2
@@ -0,0 +1,43 @@
+# tests/test_sidecar.py
+from pathlib import Path
+import tempfile
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from modules import metrics, sidecar
+from modules.backends.csv_store import CsvBackend
+
+
+def _log(n=120):
+    return pd.DataFrame({"date": pd.date_range("2025-01-01", periods=n),
+                         "juice": [i % 11 for i in range(n)], "anxiety": 4, "event": ""})
+
+
+def test_sidecar_is_reused_then_refreshed_incrementally(monkeypatch):
+    backend = CsvBackend(Path(tempfile.mkdtemp()))
+    backend.bulk_upsert("mia", _log())
+
+    first = sidecar.load(backend, "mia")
+    assert sidecar.path(backend, "mia").exists()
+    pd.testing.assert_frame_equal(first, metrics.compute(backend.load("mia")))
+
+    def boom(*a, **k):
+        raise AssertionError("full compute")
+    real = metrics.compute
+    monkeypatch.setattr(metrics, "compute", boom)
+
+    start = pd.Timestamp("2025-04-01")
+    again = sidecar.load(backend, "mia", start=start)      # fresh: read back, window only
+    pd.testing.assert_frame_equal(again, first[first["date"] >= start].reset_index(drop=True))
+
+    backend.upsert("mia", "2025-04-20", 9, 1, "edit")      # stale: spliced incrementally
+    got = sidecar.load(backend, "mia")
+    monkeypatch.setattr(metrics, "compute", real)
+    pd.testing.assert_frame_equal(got, metrics.compute(backend.load("mia")), check_exact=True)
+
+    monkeypatch.setattr(metrics, "ENGINE_VERSION", metrics.ENGINE_VERSION + 1)
+    monkeypatch.setattr(metrics, "compute", boom)
+    with pytest.raises(AssertionError, match="full compute"):   # new engine → full rebuild
+        sidecar.load(backend, "mia")
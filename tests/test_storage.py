@@ -1,8 +1,9 @@
 # tests/test_storage.py
 from pathlib import Path
 import tempfile
-import importlib, modules
+import importlib, modules.storage
 import pandas as pd
+import pytest
 import streamlit as st
 
 def _reload_with_tmp(monkeypatch, tmp):
@@ -28,3 +29,280 @@ def test_upsert_creates_file(monkeypatch):
     storage.upsert_entry(pd.Timestamp("2025-05-19"), 5, 4, "")
 
     assert (Path(tmp) / "bob.csv").exists()
+
+def test_upsert_appends_to_journal_last_write_wins(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    storage.st.session_state["nickname"] = "carol"
+    storage.upsert_entry(pd.Timestamp("2025-05-20"), 6, 3, "")
+    storage.upsert_entry(pd.Timestamp("2025-05-19"), 5, 4, "")
+    storage.upsert_entry(pd.Timestamp("2025-05-20"), 7, 2, "launch")
+
+    assert (Path(tmp) / "carol.journal.csv").exists()
+    df = storage.load_log()
+    assert df["date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-05-19", "2025-05-20"]
+    assert df.iloc[1][["juice", "anxiety", "event"]].tolist() == [7, 2, "launch"]
+
+def test_journal_compacts_at_threshold(monkeypatch):
+    monkeypatch.setenv("JOURNAL_COMPACT_AT", "3")
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    storage.st.session_state["nickname"] = "dave"
+    for d in ["2025-05-21", "2025-05-19", "2025-05-20"]:
+        storage.upsert_entry(pd.Timestamp(d), 5, 4, "")
+
+    assert not (Path(tmp) / "dave.journal.csv").exists()
+    base = pd.read_csv(Path(tmp) / "dave.csv")
+    assert base["date"].tolist() == ["2025-05-19", "2025-05-20", "2025-05-21"]
+
+def test_sqlite_backend_upserts_in_place(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    storage.st.session_state["nickname"] = "erin"
+    storage.upsert_entry(pd.Timestamp("2025-05-20"), 6, 3, "")
+    storage.upsert_entry(pd.Timestamp("2025-05-19"), 5, 4, "")
+    storage.upsert_entry(pd.Timestamp("2025-05-20"), 7, 2, "launch")
+
+    assert storage._path() == Path(tmp) / "logs.sqlite3"
+    df = storage.load_log()
+    assert df["date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-05-19", "2025-05-20"]
+    assert df.iloc[1][["juice", "anxiety", "event"]].tolist() == [7, 2, "launch"]
+
+    mode = storage._store._conn().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+def test_sqlite_backend_filters_date_range(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    for d in ["2025-05-18", "2025-05-19", "2025-05-20", "2025-05-21"]:
+        storage._store.upsert("frank", pd.Timestamp(d), 5, 4)
+    storage._store.upsert("grace", pd.Timestamp("2025-05-19"), 1, 1)
+
+    df = storage._store.load("frank", start="2025-05-19", end="2025-05-20")
+    assert df["date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-05-19", "2025-05-20"]
+
+def test_csv_window_reads_match_full_log(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    dates = pd.date_range("2024-01-01", periods=200, freq="2D")
+    pd.DataFrame({"date": dates, "juice": range(200), "anxiety": 3, "event": ""})\
+      .to_csv(Path(tmp) / "hank.csv", index=False, date_format="%Y-%m-%d")
+    storage.st.session_state["nickname"] = "hank"
+    storage.upsert_entry(pd.Timestamp("2024-06-01"), 9, 1, "edit")   # journal overlay
+
+    full = storage.load_log()
+    start, end = pd.Timestamp("2024-05-15"), pd.Timestamp("2024-07-10")
+    got = storage.load_log(start=start, end=end, lookback=5)
+
+    first = int(full["date"].searchsorted(start))
+    expected = full[full["date"] <= end].iloc[first - 5:].reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected)
+    assert storage.date_span() == (full["date"].min(), full["date"].max())
+    assert list(storage.load_log(start=start, columns=["juice"]).columns) == ["date", "juice"]
+
+def test_load_log_is_cached_until_the_file_changes(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    storage.st.session_state["nickname"] = "ivy"
+    storage.upsert_entry(pd.Timestamp("2025-05-19"), 5, 4, "")
+    first = storage.load_log()
+    assert storage.load_log() is first
+
+    storage.upsert_entry(pd.Timestamp("2025-05-20"), 6, 3, "")
+    assert len(storage.load_log()) == 2
+
+def test_import_file_merges_chunks_last_write_wins(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    storage.st.session_state["nickname"] = "jade"
+    storage.upsert_entry(pd.Timestamp("2025-01-02"), 1, 1, "old")
+    storage.upsert_entry(pd.Timestamp("2025-03-01"), 2, 2, "kept")
+
+    src = Path(tmp) / "export.jsonl"
+    pd.DataFrame({
+        "date": ["2025-01-03", "2025-01-01", "2025-01-02", "2025-01-03"],
+        "juice": [4, 5, 6, 7], "anxiety": [3, 3, 3, 3],
+    }).to_json(src, orient="records", lines=True)
+
+    assert storage.import_file(src, chunksize=3) == 3
+    df = storage.load_log()
+    assert df["date"].dt.strftime("%Y-%m-%d").tolist() == \
+        ["2025-01-01", "2025-01-02", "2025-01-03", "2025-03-01"]
+    assert df["juice"].tolist() == [5, 6, 7, 2]
+    assert not (Path(tmp) / "jade.journal.csv").exists()
+
+def test_bulk_upsert_sqlite_and_missing_columns(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    batch = pd.DataFrame({"date": ["2025-02-01", "2025-02-02", "2025-02-01"],
+                          "juice": [1, 2, 3], "anxiety": [4, 4, 4]})
+    storage.bulk_upsert(batch, profile="kim")
+    df = storage._store.load("kim")
+    assert df["juice"].tolist() == [3, 2]
+    assert df["event"].tolist() == ["", ""]              # same blank as CSV / Parquet
+
+    with pytest.raises(ValueError, match="anxiety"):
+        storage.bulk_upsert(batch.drop(columns="anxiety"), profile="kim")
+
+    token = storage._store.version("kim")
+    storage._store.upsert("lou", "2025-02-01", 5, 5)       # another profile's save
+    assert storage._store.version("kim") == token
+    storage._store.upsert("kim", "2025-02-03", 5, 5)
+    assert storage._store.version("kim") != token
+
+def test_parquet_backend_prunes_row_groups_and_converts_csv(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "parquet")
+    monkeypatch.setenv("PARQUET_ROW_GROUP", "16")
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    dates = pd.date_range("2024-01-01", periods=200, freq="2D")
+    pd.DataFrame({"date": dates, "juice": range(200), "anxiety": 3, "event": ""})\
+      .to_csv(Path(tmp) / "liam.csv", index=False, date_format="%Y-%m-%d")
+    full = storage.CsvBackend(Path(tmp)).load("liam")
+    assert storage.convert() == {"liam": 200}
+
+    storage.st.session_state["nickname"] = "liam"
+    assert storage._path().name == "liam.parquet"
+    pd.testing.assert_frame_equal(storage.load_log(), full)
+
+    start, end = pd.Timestamp("2024-05-15"), pd.Timestamp("2024-07-10")
+    first = int(full["date"].searchsorted(start))
+    expected = full[full["date"] <= end].iloc[first - 20:].reset_index(drop=True)
+    pd.testing.assert_frame_equal(storage.load_log(start=start, end=end, lookback=20), expected)
+    assert storage.date_span() == (full["date"].min(), full["date"].max())
+    assert full["event"].eq("").all()
+
+    storage.upsert_entry(pd.Timestamp("2026-01-01"), 9, 1, "late")   # journal overlay
+    assert storage.date_span()[1] == pd.Timestamp("2026-01-01")
+    storage.compact()
+    assert not (Path(tmp) / "liam.parquet.journal.csv").exists()
+    assert storage.load_log().iloc[-1]["event"] == "late"
+
+def test_parquet_saves_survive_a_second_convert(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "parquet")
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    (Path(tmp) / "mia.csv").write_text("date,juice,anxiety,event\n2025-01-01,1,1,\n")
+    assert storage.convert() == {"mia": 1}
+    storage.st.session_state["nickname"] = "mia"
+    storage.upsert_entry(pd.Timestamp("2025-01-01"), 9, 9, "fixed")
+    assert (Path(tmp) / "mia.parquet.journal.csv").exists()
+    assert not (Path(tmp) / "mia.journal.csv").exists()
+    storage.compact()
+
+    assert storage.convert() == {"mia": None}            # already converted
+    assert storage.load_log()[["juice", "event"]].values.tolist() == [[9, "fixed"]]
+    assert storage.convert(force=True) == {"mia": 1}     # CSV rows win when forced
+    assert storage.load_log()["juice"].tolist() == [1]
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_malformed_rows_are_skipped_then_quarantined(monkeypatch, arrow):
+    from modules.backends import csv_store
+    if arrow:
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(csv_store, "_HAVE_ARROW", arrow)
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    (Path(tmp) / "nora.csv").write_text(
+        "date,juice,anxiety,event\n"
+        "2025-01-01,5,4,\n"
+        "2025-01-02,abc,4,typo\n"
+        "2025-13-01,5,4,\n"
+        "2025-01-04,6,,\n"
+        ",5,5,\n"
+        "2025-01-05,7,3,ok\n"
+        "2025-01-05,6,3,met bob, alice\n"
+    )
+    storage.st.session_state["nickname"] = "nora"
+    df = storage.load_log()
+    assert df["date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-01-01", "2025-01-05"]
+    assert df["event"].tolist() == ["", "ok"]               # not the truncated "met bob"
+    assert df.dtypes.astype(str).tolist() == ["datetime64[ns]", "float32", "float32", "string"]
+    assert storage.date_span() == (pd.Timestamp("2025-01-01"), pd.Timestamp("2025-01-05"))
+
+    storage.upsert_entry(pd.Timestamp("2025-01-06"), 8, 2, "")
+    storage.compact()                                   # rewrites the base
+    bad = pd.read_csv(Path(tmp) / "nora.quarantine.csv", dtype=str)
+    assert bad.fillna("")["date"].tolist() == ["2025-01-02", "2025-13-01", "2025-01-04", "",
+                                               "2025-01-05"]
+    assert bad["event"].iloc[-1] == "met bob, alice"
+    assert "abc" not in (Path(tmp) / "nora.csv").read_text()
+    assert len(storage.load_log()) == 3
+
+def test_rewrites_keep_the_on_disk_precision(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    (Path(tmp) / "omar.csv").write_text("date,juice,anxiety,event\n2025-01-01,5.1,4.8,\n")
+    batch = pd.DataFrame({"date": ["2025-01-02"], "juice": [6.3], "anxiety": [2]})
+    storage.bulk_upsert(batch, profile="omar")
+    assert (Path(tmp) / "omar.csv").read_text() == \
+        "date,juice,anxiety,event\n2025-01-01,5.1,4.8,\n2025-01-02,6.3,2,\n"
+
+def test_unsorted_base_file_is_read_in_full(monkeypatch):
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    (Path(tmp) / "quin.csv").write_text("date,juice,anxiety,event\n"
+                                        "2025-02-01,3,3,\n2025-01-01,1,1,\n2025-01-15,2,2,\n")
+    storage.st.session_state["nickname"] = "quin"
+    assert storage.date_span() == (pd.Timestamp("2025-01-01"), pd.Timestamp("2025-02-01"))
+    assert storage.load_log(start=pd.Timestamp("2025-01-10"))["juice"].tolist() == [2, 3]
+    assert storage.load_log()["juice"].tolist() == [1, 2, 3]
+
+def test_cli_import_reports_missing_columns(monkeypatch, capsys):
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+    from modules import cli
+    monkeypatch.setattr(cli, "storage", storage)
+
+    src = Path(tmp) / "nodate.csv"
+    src.write_text("day,juice,anxiety\n2025-01-01,5,4\n")
+    assert cli.main(["import", "rex", str(src)]) == 2
+    assert "missing column(s): date" in capsys.readouterr().err
+
+@pytest.mark.parametrize("kind", ["csv", "parquet"])
+def test_profiles_keep_dotted_nicknames(monkeypatch, kind):
+    monkeypatch.setenv("STORAGE_BACKEND", kind)
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    for nick in ("j.doe", "sam"):
+        storage.bulk_upsert(pd.DataFrame({"date": ["2025-01-01"], "juice": [5], "anxiety": [4]}),
+                            profile=nick)
+        storage._store.upsert(nick, "2025-01-02", 5, 5)          # leaves a journal
+    for name in ("sam.metrics.parquet", "sam.quarantine.csv", ".sam.csv.1.2.tmp"):
+        (Path(tmp) / name).write_text("")
+    assert storage.profiles() == ["j.doe", "sam"]
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_log_without_event_column_loads(monkeypatch, arrow):
+    from modules.backends import csv_store
+    if arrow:
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(csv_store, "_HAVE_ARROW", arrow)
+    tmp = tempfile.mkdtemp()
+    storage = _reload_with_tmp(monkeypatch, tmp)
+
+    (Path(tmp) / "uma.csv").write_text("date,juice,anxiety\n2025-01-01,5,4\n2025-01-02,6,3\n")
+    storage.st.session_state["nickname"] = "uma"
+    df = storage.load_log(start=pd.Timestamp("2025-01-02"), lookback=1)
+    assert df["juice"].tolist() == [5, 6] and df["event"].tolist() == ["", ""]
+    assert df.dtypes.astype(str).tolist() == ["datetime64[ns]", "float32", "float32", "string"]
+
+    (Path(tmp) / "uma.csv").write_text("date,juice,anxiety\n2025-01-01,5,4\n2025-01-02,x,3\n")
+    assert storage.load_log()["event"].tolist() == [""]          # validating path too